@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from api_yamdb.db import configure_sqlite
+        from . import signals  # noqa: F401
+
+        connection_created.connect(configure_sqlite)
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+ROLE_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+ROLE_CLAIMS_CACHE_KEY = 'jwt_role_claims:{}'
+
+
+def get_role_claims(user):
+    return {claim: getattr(user, claim) for claim in ROLE_CLAIMS}
+
+
+def get_access_token(user):
+    token = AccessToken.for_user(user)
+    for claim, value in get_role_claims(user).items():
+        token[claim] = value
+    return token
+
+
+def refresh_role_claims(user, deleted=False):
+    """Публикует актуальные права пользователя для уже выданных токенов."""
+    cache.set(
+        ROLE_CLAIMS_CACHE_KEY.format(user.pk),
+        {'is_active': False} if deleted or not user.is_active
+        else get_role_claims(user),
+        settings.ROLE_CLAIMS_MAX_AGE.total_seconds(),
+    )
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь, собранный из claims токена без запроса к БД."""
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    @property
+    def is_admin(self):
+        return (
+            self.role == User.ADMIN
+            or self.is_superuser
+            or self.is_staff
+        )
+
+
+class RoleJWTAuthentication(JWTAuthentication):
+    """
+    Доверяет claims роли, пока токен моложе ROLE_CLAIMS_MAX_AGE.
+
+    Любое сохранение пользователя публикует его права в кэш, и они видны
+    сразу; более старые токены сверяются с БД не чаще раза в
+    ROLE_CLAIMS_MAX_AGE. Токены без claims роли проверяются по БД, как в
+    JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token:
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        key = ROLE_CLAIMS_CACHE_KEY.format(user_id)
+        claims = cache.get(key)
+        if claims is None and self.is_stale(validated_token):
+            claims = User.objects.filter(
+                pk=user_id, is_active=True
+            ).values(*ROLE_CLAIMS).first() or {'is_active': False}
+            cache.set(
+                key, claims, settings.ROLE_CLAIMS_MAX_AGE.total_seconds()
+            )
+        if claims and not claims.get('is_active', True):
+            raise AuthenticationFailed(
+                'Пользователь не найден или неактивен',
+                code='user_not_found'
+            )
+        return RoleTokenUser({**validated_token.payload, **(claims or {})})
+
+    @staticmethod
+    def is_stale(validated_token):
+        return (
+            timezone.now().timestamp() - validated_token['iat']
+            > settings.ROLE_CLAIMS_MAX_AGE.total_seconds()
+        )
@@ -0,0 +1,120 @@
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework import status
+
+logger = logging.getLogger(__name__)
+
+BATCH_HEADERS = ('ETag', 'Last-Modified', 'Location')
+FORWARDED_META = (
+    'HTTP_AUTHORIZATION', 'HTTP_HOST', 'HTTP_ACCEPT_LANGUAGE',
+    'SERVER_NAME', 'SERVER_PORT', 'REMOTE_ADDR', 'wsgi.url_scheme',
+    'wsgi.errors', 'wsgi.version', 'wsgi.multithread', 'wsgi.multiprocess',
+    'wsgi.run_once',
+)
+
+
+def build_request(request, method, path, body):
+    """WSGI-запрос к path с аутентификацией и хостом исходного запроса."""
+    path, _, query = path.partition('?')
+    payload = b'' if body is None else json.dumps(body).encode()
+    environ = {
+        key: value for key, value in request.META.items()
+        if key in FORWARDED_META
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'HTTP_ACCEPT': 'application/json, */*;q=0.1',
+        'wsgi.input': io.BytesIO(payload),
+    })
+    environ.setdefault('wsgi.url_scheme', request.scheme)
+    environ.setdefault('SERVER_NAME', 'testserver')
+    environ.setdefault('SERVER_PORT', '80')
+    return WSGIRequest(environ)
+
+
+def get_body(response):
+    if not response.content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content)
+    return response.content.decode(response.charset)
+
+
+def execute(request, item):
+    """Выполняет один подзапрос через представление из urlpatterns."""
+    try:
+        match = resolve(item['path'].partition('?')[0])
+    except Resolver404:
+        return {'status': status.HTTP_404_NOT_FOUND,
+                'body': {'detail': 'Страница не найдена.'}}
+    sub_request = build_request(
+        request, item['method'], item['path'], item.get('body')
+    )
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Http404:
+        return {'status': status.HTTP_404_NOT_FOUND,
+                'body': {'detail': 'Страница не найдена.'}}
+    except Exception:
+        logger.exception('Batch sub-request %s %s failed',
+                         item['method'], item['path'])
+        return {'status': status.HTTP_500_INTERNAL_SERVER_ERROR,
+                'body': {'detail': 'Ошибка сервера.'}}
+    if response.streaming:
+        response.close()
+        return {'status': status.HTTP_400_BAD_REQUEST,
+                'body': {'detail': 'Потоковые ответы в пакете недоступны.'}}
+    if hasattr(response, 'render'):
+        response.render()
+    return {
+        'status': response.status_code,
+        'headers': {
+            header: response[header] for header in BATCH_HEADERS
+            if response.has_header(header)
+        },
+        'body': get_body(response),
+    }
+
+
+def execute_in_thread(request, item):
+    try:
+        return execute(request, item)
+    finally:
+        connection.close()
+
+
+def execute_batch(request, items):
+    """
+    Выполняет подзапросы по порядку и возвращает ответы в том же порядке.
+
+    Подряд идущие GET-запросы независимы и выполняются параллельно в
+    пуле из BATCH_MAX_WORKERS потоков; любой другой метод дожидается
+    всех предыдущих подзапросов и выполняется сам по себе.
+    """
+    results = []
+    with ThreadPoolExecutor(settings.BATCH_MAX_WORKERS) as executor:
+        for is_get, group in groupby(
+            items, key=lambda item: item['method'] == 'GET'
+        ):
+            group = list(group)
+            if is_get and len(group) > 1:
+                results.extend(executor.map(
+                    lambda item: execute_in_thread(request, item), group
+                ))
+            else:
+                results.extend(execute(request, item) for item in group)
+    return results
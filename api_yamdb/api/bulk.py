@@ -0,0 +1,139 @@
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from rest_framework import status
+
+from .catalogue import catalogue
+from .serializers import TitleSerializer
+from reviews.models import Title
+
+logger = logging.getLogger(__name__)
+
+NOT_AN_OBJECT = 'Ожидается объект произведения'
+INVALID_ID = 'Ожидается целочисленный id'
+TITLE_NOT_FOUND = 'Произведение не найдено'
+CHUNK_FAILED = 'Не удалось сохранить пачку'
+
+
+def failed(index, status_code, errors):
+    return {'index': index, 'status': status_code, 'errors': errors}
+
+
+def get_pk(item):
+    """id элемента: None, если его нет, и False, если он некорректен."""
+    pk = item.get('id')
+    if pk is None:
+        return None
+    if isinstance(pk, bool):
+        return False
+    try:
+        return int(pk)
+    except (TypeError, ValueError):
+        return False
+
+
+def validate_chunk(request, offset, items, snapshot):
+    """Результаты с ошибками и (позиция, произведение, данные) для записи."""
+    results = [None] * len(items)
+    instances = Title.objects.filter(is_hidden=False).in_bulk({
+        get_pk(item) for item in items
+        if isinstance(item, dict) and get_pk(item)
+    })
+    valid = []
+    for position, item in enumerate(items):
+        index = offset + position
+        if not isinstance(item, dict):
+            results[position] = failed(
+                index, status.HTTP_400_BAD_REQUEST,
+                {'non_field_errors': [NOT_AN_OBJECT]},
+            )
+            continue
+        pk = get_pk(item)
+        if pk is False:
+            results[position] = failed(
+                index, status.HTTP_400_BAD_REQUEST, {'id': [INVALID_ID]}
+            )
+            continue
+        instance = None if pk is None else instances.get(pk)
+        if pk is not None and instance is None:
+            results[position] = failed(
+                index, status.HTTP_404_NOT_FOUND, {'id': [TITLE_NOT_FOUND]}
+            )
+            continue
+        serializer = TitleSerializer(
+            instance, data=item, partial=instance is not None,
+            context={'request': request, 'catalogue': snapshot},
+        )
+        if not serializer.is_valid():
+            results[position] = failed(
+                index, status.HTTP_400_BAD_REQUEST, serializer.errors
+            )
+            continue
+        valid.append((position, instance, dict(serializer.validated_data)))
+    return results, valid
+
+
+def write_chunk(offset, valid, results):
+    """Записывает проверенные произведения пачки в одной транзакции."""
+    created, updated = {}, {}
+    with transaction.atomic():
+        for position, instance, data in valid:
+            genres = data.pop('genre', None)
+            title = instance or Title()
+            for field, value in data.items():
+                setattr(title, field, value)
+            title.save()
+            if instance is None:
+                created[title] = genres
+            elif genres is not None:
+                updated[title] = genres
+            results[position] = {
+                'index': offset + position,
+                'status': (
+                    status.HTTP_201_CREATED if instance is None
+                    else status.HTTP_200_OK
+                ),
+                'id': title.pk,
+            }
+        Title.set_genres_many(created, created=True)
+        Title.set_genres_many(updated)
+
+
+def upsert_titles(request, items):
+    """
+    Создаёт и обновляет произведения пачками по TITLE_BULK_CHUNK_SIZE.
+
+    Элемент с id обновляет существующее произведение (как PATCH), без id
+    создаёт новое. Каждая пачка проверяется сериализатором произведения по
+    одному снимку каталога и записывается в своей транзакции, жанры всей
+    пачки сохраняются одним bulk_create; ошибка одного элемента не мешает
+    остальным.
+    """
+    snapshot = catalogue.get()
+    results = []
+    size = settings.TITLE_BULK_CHUNK_SIZE
+    for offset in range(0, len(items), size):
+        chunk_results, valid = validate_chunk(
+            request, offset, items[offset:offset + size], snapshot
+        )
+        try:
+            write_chunk(offset, valid, chunk_results)
+        except DatabaseError:
+            logger.exception('Title bulk chunk at %d failed', offset)
+            for position, _, _ in valid:
+                chunk_results[position] = failed(
+                    offset + position,
+                    status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    {'non_field_errors': [CHUNK_FAILED]},
+                )
+        results.extend(chunk_results)
+    counts = {'created': 0, 'updated': 0, 'failed': 0}
+    for result in results:
+        if result['status'] == status.HTTP_201_CREATED:
+            counts['created'] += 1
+        elif result['status'] == status.HTTP_200_OK:
+            counts['updated'] += 1
+        else:
+            counts['failed'] += 1
+    return {**counts, 'results': results}
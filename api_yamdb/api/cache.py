@@ -0,0 +1,158 @@
+import hashlib
+import json
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+VERSION_KEY = 'api:version:{}'
+RESPONSE_KEY = 'api:response:{}'
+
+CATALOGUE = 'catalogue'
+TITLE_LIST = 'titles'
+TITLE = 'title:{}'
+REVIEWS = 'reviews:{}'
+REVIEW = 'review:{}'
+COMMENTS = 'comments:{}'
+COMMENT = 'comment:{}'
+TITLE_COMMENTS = 'title_comments:{}'
+USERS = 'users'
+USER = 'user:{}'
+AUTHORS = 'authors'
+
+IGNORED_QUERY_PARAMS = ('format',)
+
+
+def get_versions(*names):
+    """Метки времени последних изменений, по одной на каждое имя."""
+    keys = [VERSION_KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        for key, value in missing.items():
+            cache.add(key, value, None)
+        versions.update(cache.get_many(list(missing)))
+    return [versions.get(key, missing.get(key)) for key in keys]
+
+
+def touch(*names):
+    """Отмечает изменение: все ответы, зависящие от names, устаревают."""
+    now = time.time()
+    cache.set_many({VERSION_KEY.format(name): now for name in names}, None)
+
+
+def normalize_query(request):
+    return '&'.join(
+        f'{key}={value}'
+        for key, values in sorted(request.query_params.lists())
+        if key not in IGNORED_QUERY_PARAMS
+        for value in values
+        if value != ''
+    )
+
+
+class VersionedResponseMixin:
+    """
+    Валидаторы ETag/Last-Modified ответа по версиям его зависимостей.
+
+    Запрос с совпадающим If-None-Match получает 304 до выборки и
+    сериализации; If-Modified-Since без If-None-Match не проверяется.
+    При cache_responses данные ответа ещё и кэшируются; готовое JSON-тело
+    (HttpResponse) кэшируется байтами.
+    """
+    cache_responses = False
+    response_cache_timeout = settings.API_RESPONSE_CACHE_TIMEOUT
+
+    def get_list_versions(self):
+        raise NotImplementedError
+
+    def get_detail_versions(self):
+        raise NotImplementedError
+
+    def get_version_scope(self, request):
+        return request.path
+
+    def get_version_id(self, name):
+        """
+        id из URL в том виде, в каком его отмечают сигналы: /titles/05/ и
+        /titles/5/ зависят от одной версии title:5.
+        """
+        try:
+            return int(self.kwargs[name])
+        except (TypeError, ValueError):
+            raise NotFound()
+
+    def uses_versioned_cache(self, request):
+        """Можно ли выдать валидаторы и закэшировать ответ на request."""
+        return True
+
+    def versioned_response(self, request, versions, build):
+        if not self.uses_versioned_cache(request):
+            return build()
+        stamps = get_versions(*versions)
+        key = hashlib.md5(
+            f'{self.get_version_scope(request)}:{request.get_host()}:'
+            f'{normalize_query(request)}:{stamps}'.encode()
+        ).hexdigest()
+        etag = quote_etag(key)
+        last_modified = math.ceil(max(stamps))
+        # Last-Modified точен до секунды, и две записи за одну секунду дают
+        # одинаковый заголовок, поэтому 304 отдаётся только по ETag.
+        not_modified = get_conditional_response(request._request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        data = cache.get(RESPONSE_KEY.format(key)) if (
+            self.cache_responses) else None
+        if data is None:
+            response = build()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            if self.cache_responses:
+                cache.set(
+                    RESPONSE_KEY.format(key),
+                    response.data if isinstance(response, Response)
+                    else response.content,
+                    self.response_cache_timeout
+                )
+        elif not isinstance(data, bytes):
+            response = Response(data)
+        elif request.accepted_renderer.format == 'json':
+            response = HttpResponse(data, content_type='application/json')
+        else:
+            response = Response(json.loads(data))
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class VersionedListMixin(VersionedResponseMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.versioned_response(
+            request, self.get_list_versions(),
+            lambda: super(VersionedListMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class VersionedRetrieveMixin(VersionedResponseMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.versioned_response(
+            request, self.get_detail_versions(),
+            lambda: super(VersionedRetrieveMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class VersionedReadMixin(VersionedListMixin, VersionedRetrieveMixin):
+    pass
@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import prefetch_related_objects
+from django.http import HttpResponse
+from rest_framework.generics import get_object_or_404
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .cache import CATALOGUE, TITLE, VERSION_KEY, get_versions
+from .catalogue import GENRE_LINKS
+from .serializers import TitleListRetrieveSerializer
+from api_yamdb.db import PRIMARY
+
+CARD_KEY = 'title_card:{}'
+RESULTS_TAIL = b'[]}'
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+def get_cards(titles, database=PRIMARY):
+    """
+    JSON-карточки произведений в порядке titles.
+
+    Карточка хранит версии CATALOGUE и TITLE произведения, для которых
+    была собрана, и пересобирается, только если одна из них изменилась;
+    жанры подгружаются одним запросом только для пересобираемых карточек.
+    В кэш на TITLE_CARD_TIMEOUT попадают только карточки из основной базы:
+    реплика может отставать от версий.
+    """
+    keys = {title.pk: CARD_KEY.format(title.pk) for title in titles}
+    names = [CATALOGUE, *[TITLE.format(pk) for pk in keys]]
+    version_keys = [VERSION_KEY.format(name) for name in names]
+    stored = cache.get_many([*keys.values(), *version_keys])
+    if any(key not in stored for key in version_keys):
+        stored.update(zip(version_keys, get_versions(*names)))
+    catalogue = stored[VERSION_KEY.format(CATALOGUE)]
+    cards, missing = {}, []
+    for title in titles:
+        stamp = (catalogue, stored[VERSION_KEY.format(TITLE.format(title.pk))])
+        card = stored.get(keys[title.pk])
+        if card is not None and card[0] == stamp:
+            cards[title.pk] = card[1]
+        else:
+            missing.append((title, stamp))
+    if missing:
+        prefetch_related_objects(
+            [title for title, _ in missing], GENRE_LINKS
+        )
+        fresh = {
+            title.pk: (stamp, render(TitleListRetrieveSerializer(title).data))
+            for title, stamp in missing
+        }
+        if database == PRIMARY:
+            cache.set_many(
+                {keys[pk]: value for pk, value in fresh.items()},
+                settings.TITLE_CARD_TIMEOUT,
+            )
+        cards.update({pk: card for pk, (_, card) in fresh.items()})
+    return [cards[title.pk] for title in titles]
+
+
+def splice(envelope, cards):
+    """Подставляет готовые карточки в пустой список results конверта."""
+    body = render(envelope)
+    if not body.endswith(RESULTS_TAIL):
+        raise ImproperlyConfigured(
+            'Пагинатор должен возвращать results последним ключом'
+        )
+    return body[:-len(RESULTS_TAIL)] + b'[' + b','.join(cards) + b']}'
+
+
+def json_response(body):
+    return HttpResponse(body, content_type='application/json')
+
+
+class TitleCardMixin:
+    """
+    Список и карточка произведения из готовых JSON-байтов без сериализатора.
+
+    Для JSON-ответов страница выбирается без жанров, а тело склеивается
+    из закэшированных карточек; остальные форматы идут обычным путём.
+    """
+
+    def uses_cards(self, request):
+        return getattr(request, 'accepted_renderer', None) is not None and (
+            request.accepted_renderer.format == 'json'
+        )
+
+    def get_card_database(self):
+        return getattr(self, 'read_database', PRIMARY)
+
+    def list(self, request, *args, **kwargs):
+        if not self.uses_cards(request):
+            return super().list(request, *args, **kwargs)
+        titles = self.filter_queryset(self.get_queryset()).prefetch_related(
+            None
+        )
+        page = self.paginate_queryset(titles)
+        cards = get_cards(
+            list(titles) if page is None else page, self.get_card_database()
+        )
+        if page is None:
+            return json_response(b'[' + b','.join(cards) + b']')
+        return json_response(
+            splice(self.get_paginated_response([]).data, cards)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.uses_cards(request):
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        title = get_object_or_404(
+            self.get_queryset().prefetch_related(None),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+        self.check_object_permissions(request, title)
+        return json_response(get_cards([title], self.get_card_database())[0])
+
+    def get_bulk_response(self, request, ids):
+        """
+        Произведения с перечисленными id в порядке запроса одним запросом;
+        ненайденные id перечисляются в missing.
+        """
+        queryset = self.get_queryset().filter(pk__in=ids)
+        if self.uses_cards(request):
+            queryset = queryset.prefetch_related(None)
+        titles = queryset.in_bulk()
+        found = [titles[pk] for pk in ids if pk in titles]
+        envelope = {'missing': [pk for pk in ids if pk not in titles]}
+        if not self.uses_cards(request):
+            return Response({
+                **envelope,
+                'results': self.get_serializer(found, many=True).data,
+            })
+        return json_response(splice(
+            {**envelope, 'results': []},
+            get_cards(found, self.get_card_database()),
+        ))
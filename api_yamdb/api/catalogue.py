@@ -0,0 +1,69 @@
+import logging
+import threading
+from collections import namedtuple
+
+from django.db import DatabaseError
+
+from .cache import CATALOGUE, get_versions
+from reviews.models import Category, Genre
+
+logger = logging.getLogger(__name__)
+
+GENRE_LINKS = 'genretitle_set'
+
+Snapshot = namedtuple(
+    'Snapshot', ('version', 'categories', 'category_slugs', 'genres',
+                 'genre_slugs')
+)
+
+
+class Catalogue:
+    """
+    Категории и жанры в памяти процесса.
+
+    Снимок таблиц помечен версией CATALOGUE из общего кэша; сигналы
+    сдвигают её при любом изменении категории или жанра, и каждый процесс
+    перечитывает обе таблицы при первом обращении после этого.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot = None
+
+    def load(self, version):
+        categories = {
+            category.pk: category for category in Category.objects.all()
+        }
+        genres = {genre.pk: genre for genre in Genre.objects.all()}
+        return Snapshot(
+            version,
+            categories,
+            {category.slug: category for category in categories.values()},
+            genres,
+            {genre.slug: genre for genre in genres.values()},
+        )
+
+    def get(self, refresh=False):
+        """Актуальный снимок; refresh перечитывает таблицы без проверки."""
+        version = get_versions(CATALOGUE)[0]
+        snapshot = self.snapshot
+        if not refresh and snapshot is not None and (
+            snapshot.version == version
+        ):
+            return snapshot
+        with self.lock:
+            if self.snapshot is not snapshot and (
+                self.snapshot.version == version
+            ):
+                return self.snapshot
+            self.snapshot = self.load(version)
+            return self.snapshot
+
+    def warm(self):
+        try:
+            self.get()
+        except DatabaseError:
+            logger.warning('Catalogue warm-up failed', exc_info=True)
+
+
+catalogue = Catalogue()
@@ -0,0 +1,157 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.text import compress_sequence
+from rest_framework import serializers
+
+from .catalogue import catalogue
+from .filters import TitleFilter
+from .renderers import to_csv, to_ndjson
+from api_yamdb.db import get_replica
+from reviews.models import Comment, GenreTitle, Review, Title
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_int_param(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise serializers.ValidationError({name: ['Ожидается целое число']})
+
+
+class BaseExport:
+    """Выгрузка таблицы: строки читаются с сервера пачками через iterator()."""
+    columns = ()
+
+    def get_queryset(self, request):
+        raise NotImplementedError
+
+    def to_rows(self, chunk, database):
+        return [dict(zip(self.columns, row)) for row in chunk]
+
+
+class TitleExport(BaseExport):
+    columns = (
+        'id', 'name', 'year', 'description', 'category', 'genre', 'rating',
+    )
+
+    def get_queryset(self, request):
+        filterset = TitleFilter(
+            request.query_params, Title.objects.filter(is_hidden=False)
+        )
+        if not filterset.is_valid():
+            raise serializers.ValidationError(filterset.errors)
+        return filterset.qs.values_list(
+            'id', 'name', 'year', 'description', 'category_id', 'rating'
+        )
+
+    def to_rows(self, chunk, database):
+        """Слаги берутся из каталога, связи с жанрами одним запросом."""
+        snapshot = catalogue.get()
+        genres = defaultdict(list)
+        for title_id, genre_id in GenreTitle.objects.using(database).filter(
+            title_id__in=[row[0] for row in chunk]
+        ).values_list('title_id', 'genre_id'):
+            genre = snapshot.genres.get(genre_id)
+            if genre is not None:
+                genres[title_id].append(genre.slug)
+        rows = []
+        for pk, name, year, description, category_id, rating in chunk:
+            category = snapshot.categories.get(category_id)
+            rows.append({
+                'id': pk,
+                'name': name,
+                'year': year,
+                'description': description,
+                'category': category and category.slug,
+                'genre': sorted(genres[pk]),
+                'rating': rating,
+            })
+        return rows
+
+
+class ReviewExport(BaseExport):
+    columns = ('id', 'title_id', 'author', 'text', 'score', 'pub_date')
+
+    def get_queryset(self, request):
+        queryset = Review.objects.filter(title__is_hidden=False)
+        title_id = get_int_param(request, 'title')
+        if title_id is not None:
+            queryset = queryset.filter(title_id=title_id)
+        return queryset.values_list(
+            'id', 'title_id', 'author__username', 'text', 'score', 'pub_date'
+        )
+
+
+class CommentExport(BaseExport):
+    columns = ('id', 'review_id', 'author', 'text', 'pub_date')
+
+    def get_queryset(self, request):
+        queryset = Comment.objects.filter(review__title__is_hidden=False)
+        review_id = get_int_param(request, 'review')
+        if review_id is not None:
+            queryset = queryset.filter(review_id=review_id)
+        return queryset.values_list(
+            'id', 'review_id', 'author__username', 'text', 'pub_date'
+        )
+
+
+EXPORTS = {
+    'titles': TitleExport,
+    'reviews': ReviewExport,
+    'comments': CommentExport,
+}
+
+
+def generate(export, queryset, output_format):
+    size = settings.EXPORT_CHUNK_SIZE
+    header = output_format == 'csv'
+    for rows in chunked(queryset.iterator(chunk_size=size), size):
+        rows = export.to_rows(rows, queryset.db)
+        if output_format == 'csv':
+            yield to_csv(rows, export.columns, header=header).encode()
+            header = False
+        else:
+            yield to_ndjson(rows).encode()
+    if header:
+        yield to_csv([], export.columns, header=True).encode()
+
+
+def stream_export(request, resource):
+    """
+    Потоковый ответ с таблицей resource в формате NDJSON или CSV.
+
+    Выгрузка читается из реплики, если она есть, и сжимается gzip, если
+    клиент передал Accept-Encoding: gzip.
+    """
+    export = EXPORTS[resource]()
+    queryset = export.get_queryset(request).order_by('pk').using(
+        get_replica()
+    )
+    output_format = request.accepted_renderer.format
+    content = generate(export, queryset, output_format)
+    gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    response = StreamingHttpResponse(
+        compress_sequence(content) if gzip else content,
+        content_type=f'{request.accepted_renderer.media_type}; charset=utf-8',
+    )
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    response['Vary'] = 'Accept-Encoding'
+    response['Content-Disposition'] = (
+        f'attachment; filename="{resource}.{output_format}"'
+    )
+    return response
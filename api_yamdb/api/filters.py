@@ -1,6 +1,10 @@
 import django_filters
+from django.db.models import Case, IntegerField, When
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
 
 from reviews.models import Title
+from reviews.search import TITLE_KIND, get_backend
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -15,3 +19,31 @@ class TitleFilter(django_filters.FilterSet):
     class Meta:
         model = Title
         fields = ('name', 'category', 'genre', 'year',)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    ?search= по полнотекстовому индексу произведений.
+
+    Без явного ?ordering= результаты упорядочены по релевантности.
+    """
+    search_param = 'search'
+    search_kind = TITLE_KIND
+    max_results = 500
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        ids = [
+            object_id for _, object_id, _ in get_backend().search(
+                query, kinds=(self.search_kind,), limit=self.max_results
+            )
+        ]
+        queryset = queryset.filter(pk__in=ids)
+        if not ids or api_settings.ORDERING_PARAM in request.query_params:
+            return queryset
+        return queryset.order_by(Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        ))
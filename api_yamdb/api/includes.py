@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .cache import AUTHORS, REVIEWS, TITLE_COMMENTS
+from .cards import render
+from .serializers import CommentSerializer, ReviewSerializer
+from reviews.models import Comment, Review, Title
+
+REVIEWS_INCLUDE = 'reviews'
+COMMENTS_INCLUDE = 'reviews.comments'
+INCLUDES = (REVIEWS_INCLUDE, COMMENTS_INCLUDE)
+
+
+class TitleIncludeMixin:
+    """
+    ?include=reviews,reviews.comments встраивает в карточку произведения
+    первую страницу отзывов и до INCLUDE_COMMENTS_LIMIT комментариев к
+    каждому отзыву.
+
+    Сколько бы ни было отзывов, связанные записи читаются тремя
+    запросами: число отзывов, страница отзывов, комментарии ко всем
+    отзывам страницы.
+    """
+    include_query_param = 'include'
+
+    def get_includes(self):
+        if self.action != 'retrieve':
+            return ()
+        value = self.request.query_params.get(self.include_query_param)
+        if not value:
+            return ()
+        includes = {name.strip() for name in value.split(',') if name.strip()}
+        if not includes or includes - set(INCLUDES):
+            raise serializers.ValidationError({
+                self.include_query_param: [
+                    f'Допустимые значения: {", ".join(INCLUDES)}'
+                ]
+            })
+        if COMMENTS_INCLUDE in includes:
+            includes.add(REVIEWS_INCLUDE)
+        return tuple(name for name in INCLUDES if name in includes)
+
+    def get_include_versions(self, title_id):
+        includes = self.get_includes()
+        versions = ()
+        if REVIEWS_INCLUDE in includes:
+            versions += (REVIEWS.format(title_id), AUTHORS)
+        if COMMENTS_INCLUDE in includes:
+            versions += (TITLE_COMMENTS.format(title_id),)
+        return versions
+
+    def get_included_reviews(self, title_id, includes):
+        page_size = api_settings.PAGE_SIZE
+        count = Title.objects.filter(pk=title_id).values_list(
+            'review_count', flat=True
+        ).first() or 0
+        reviews = list(
+            Review.objects.filter(title_id=title_id).select_related(
+                'author'
+            ).order_by('pub_date', 'id')[:page_size]
+        )
+        results = ReviewSerializer(reviews, many=True).data
+        if COMMENTS_INCLUDE in includes:
+            first_comments = Comment.objects.filter(
+                review_id=OuterRef('review_id')
+            ).order_by('pub_date', 'id').values('pk')[
+                :settings.INCLUDE_COMMENTS_LIMIT
+            ]
+            comments = defaultdict(list)
+            for comment in Comment.objects.filter(
+                review_id__in=[review.pk for review in reviews],
+                pk__in=Subquery(first_comments),
+            ).select_related('author').order_by('pub_date', 'id'):
+                comments[comment.review_id].append(comment)
+            for review, data in zip(reviews, results):
+                data['comments'] = CommentSerializer(
+                    comments[review.pk], many=True
+                ).data
+        next_link = None
+        if count > page_size:
+            next_link = replace_query_param(
+                self.request.build_absolute_uri(reverse(
+                    'api:reviews-list', kwargs={'title_id': title_id}
+                )),
+                'page', 2,
+            )
+        return {'count': count, 'next': next_link, 'results': results}
+
+    def retrieve(self, request, *args, **kwargs):
+        includes = self.get_includes()
+        response = super().retrieve(request, *args, **kwargs)
+        if not includes or response.status_code != 200:
+            return response
+        included = self.get_included_reviews(self.kwargs['pk'], includes)
+        if isinstance(response, Response):
+            response.data = {**response.data, REVIEWS_INCLUDE: included}
+            return response
+        response.content = (
+            response.content[:-1] + f',"{REVIEWS_INCLUDE}":'.encode()
+            + render(included) + b'}'
+        )
+        return response
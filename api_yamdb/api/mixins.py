@@ -1,6 +1,17 @@
 import re
 
-from rest_framework import mixins, viewsets, filters, serializers
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import mixins, viewsets, filters, serializers, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .pagination import KeysetPagination
+from api_yamdb.db import PRIMARY, get_replica, reset_reads, route_reads
+from reviews import purge
+
+STICKY_KEY = 'db:sticky:{}'
 
 
 class CreateDestroyList(
@@ -14,6 +25,164 @@ class CreateDestroyList(
     lookup_field = 'slug'
 
 
+class KeysetPaginationMixin:
+    keyset_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, '_paginator')
+            and self.keyset_pagination_class.is_requested(self.request)
+        ):
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
+
+
+class ReplicaReadMixin:
+    """
+    Безопасные запросы читают из реплики, остальные из основной базы.
+
+    После успешной записи пользователь на REPLICA_STICKY_TIMEOUT секунд
+    закрепляется за основной базой и видит свои изменения, даже если
+    реплика ещё не догнала её. Ответы из реплики не кэшируются и не
+    получают ETag/Last-Modified.
+    """
+    read_database = PRIMARY
+
+    def get_read_database(self, request):
+        if not settings.DATABASE_REPLICAS or (
+            request.method not in SAFE_METHODS
+        ):
+            return PRIMARY
+        if request.user.is_authenticated and cache.get(
+            STICKY_KEY.format(request.user.id)
+        ):
+            return PRIMARY
+        return get_replica()
+
+    def uses_versioned_cache(self, request):
+        # Реплика может отставать от версий, сдвинутых записью в основную
+        # базу: её ответ нельзя кэшировать и помечать свежими валидаторами.
+        return self.read_database == PRIMARY and (
+            super().uses_versioned_cache(request)
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.read_database = self.get_read_database(request)
+        self.reads_token = route_reads(self.read_database)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, 'reads_token', None)
+        if token is not None:
+            reset_reads(token)
+            self.reads_token = None
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            cache.set(
+                STICKY_KEY.format(request.user.id), True,
+                settings.REPLICA_STICKY_TIMEOUT,
+            )
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class BackgroundDestroyMixin:
+    """
+    Объекты с большим числом зависимых записей удаляются в фоне.
+
+    Если отзывов и комментариев больше PURGE_THRESHOLD, объект сразу
+    скрывается, а ответ 202 содержит задачу удаления и ссылку на неё.
+    """
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        if not purge.is_heavy(instance):
+            self.perform_destroy(instance)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        from .serializers import PurgeJobSerializer
+
+        job = self.perform_purge(instance)
+        return Response(
+            PurgeJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': request.build_absolute_uri(
+                reverse('api:purges-detail', kwargs={'pk': job.pk})
+            )},
+        )
+
+    def perform_purge(self, instance):
+        return purge.schedule_purge(instance)
+
+
+class SparseFieldsMixin:
+    """
+    Параметр fields= оставляет в ответе только перечисленные поля.
+
+    Запрос загружает лишь нужные столбцы через only(), а связи из
+    sparse_select_related и sparse_prefetch_related подключаются, только
+    если их поле запрошено.
+    """
+    sparse_fields_param = 'fields'
+    sparse_actions = ('list', 'retrieve')
+    sparse_fields = {}
+    sparse_always = ('id',)
+    sparse_select_related = {}
+    sparse_prefetch_related = {}
+
+    def get_sparse_fields(self):
+        if self.action not in self.sparse_actions:
+            return None
+        value = self.request.query_params.get(self.sparse_fields_param)
+        if not value:
+            return None
+        fields = tuple(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        unknown = [name for name in fields if name not in self.sparse_fields]
+        if unknown or not fields:
+            raise serializers.ValidationError({
+                self.sparse_fields_param: [
+                    f'Допустимые поля: {", ".join(self.sparse_fields)}'
+                ]
+            })
+        return fields
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if not fields:
+            return queryset
+        select_related = [
+            relation for name, relation in self.sparse_select_related.items()
+            if name in fields
+        ]
+        queryset = queryset.select_related(None).prefetch_related(
+            None
+        ).prefetch_related(*[
+            relation
+            for name, relation in self.sparse_prefetch_related.items()
+            if name in fields
+        ]).only(*self.sparse_always, *[
+            column for name in fields for column in self.sparse_fields[name]
+        ])
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields:
+            target = getattr(serializer, 'child', serializer)
+            for name in set(target.fields) - set(fields):
+                target.fields.pop(name)
+        return serializer
+
+
 class MeValidator(
     mixins.CreateModelMixin,
     viewsets.GenericViewSet,
@@ -0,0 +1,109 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по ключу (pub_date, id) без COUNT и OFFSET.
+
+    Курсор хранит ключ крайней записи страницы и направление, поэтому
+    любая страница стоит столько же, сколько первая.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    mode = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+
+    @classmethod
+    def is_requested(cls, request):
+        return (
+            cls.cursor_query_param in request.query_params
+            or request.query_params.get(cls.mode_query_param) == cls.mode
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = api_settings.PAGE_SIZE
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        position, reverse = self.decode_cursor(request)
+        if position is not None:
+            pub_date, pk = position
+            condition = (
+                Q(pub_date__lt=pub_date)
+                | Q(pub_date=pub_date, id__lt=pk)
+            ) if reverse else (
+                Q(pub_date__gt=pub_date)
+                | Q(pub_date=pub_date, id__gt=pk)
+            )
+            queryset = queryset.filter(condition)
+        ordering = ('-pub_date', '-id') if reverse else ('pub_date', 'id')
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = page
+        return page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            pub_date, pk, reverse = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii'))
+            )
+            pub_date = parse_datetime(pub_date)
+            if pub_date is None:
+                raise ValueError
+            return (pub_date, int(pk)), bool(reverse)
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse):
+        cursor = json.dumps([obj.pub_date.isoformat(), obj.pk, reverse])
+        return replace_query_param(
+            remove_query_param(self.base_url, self.mode_query_param),
+            self.cursor_query_param,
+            base64.urlsafe_b64encode(cursor.encode()).decode('ascii'),
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
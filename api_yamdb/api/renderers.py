@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+def to_ndjson(rows):
+    return ''.join(
+        json.dumps(row, ensure_ascii=False, default=str) + '\n'
+        for row in rows
+    )
+
+
+def to_csv_value(value):
+    if isinstance(value, (list, tuple)):
+        return ','.join(str(item) for item in value)
+    return value
+
+
+def to_csv(rows, columns, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows(
+        [to_csv_value(row[column]) for column in columns] for row in rows
+    )
+    return buffer.getvalue()
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Построчный JSON. Выгрузки отдают поток сами, рендерер нужен для выбора
+    формата и ответов с ошибками.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return to_ndjson([data]).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict):
+            return b''
+        return to_csv([data], list(data), header=True).encode(self.charset)
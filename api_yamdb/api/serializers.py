@@ -3,11 +3,16 @@ import datetime
 from django.conf import settings
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import transaction
+from django.urls import Resolver404, resolve
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
+from .catalogue import GENRE_LINKS, catalogue
 from .mixins import MeValidator
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, PurgeJob, Review,
+                            Title)
+from reviews.search import KINDS
 from users.models import User
 
 
@@ -25,9 +30,91 @@ class GenreSerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
+class CatalogueLookupMixin:
+    """
+    Категории и жанры берутся из каталога процесса, а не из базы.
+
+    Снимок каталога можно передать в context['catalogue'], чтобы все
+    сериализаторы пакета разрешали слаги по одному снимку.
+    """
+    snapshot = None
+    refreshed = False
+
+    def lookup(self, table, key):
+        if self.snapshot is None:
+            self.snapshot = self.context.get('catalogue') or catalogue.get()
+        value = getattr(self.snapshot, table).get(key)
+        if value is None and not self.refreshed:
+            self.refreshed = True
+            self.snapshot = catalogue.get(refresh=True)
+            value = getattr(self.snapshot, table).get(key)
+        return value
+
+
+class CatalogueCategoryField(CatalogueLookupMixin, serializers.Field):
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'category_id')
+        super().__init__(read_only=True, **kwargs)
+
+    def to_representation(self, value):
+        category = self.lookup('categories', value)
+        return None if category is None else CategorySerializer(
+            category
+        ).data
+
+
+class CatalogueGenresField(CatalogueLookupMixin, serializers.Field):
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', GENRE_LINKS)
+        super().__init__(read_only=True, **kwargs)
+
+    def to_representation(self, value):
+        genres = [self.lookup('genres', link.genre_id) for link in value.all()]
+        return GenreSerializer(sorted(
+            (genre for genre in genres if genre is not None),
+            key=lambda genre: genre.name,
+        ), many=True).data
+
+
+class CatalogueSlugRelatedField(CatalogueLookupMixin,
+                                serializers.SlugRelatedField):
+
+    def __init__(self, table, **kwargs):
+        self.table = table
+        super().__init__(slug_field='slug', **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        value = self.lookup(self.table, data)
+        if value is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return value
+
+
+class CatalogueSlugListField(CatalogueLookupMixin, serializers.ListField):
+    """Список слагов; все неизвестные слаги попадают в одну ошибку."""
+
+    def __init__(self, table, **kwargs):
+        self.table = table
+        super().__init__(child=serializers.CharField(), **kwargs)
+
+    def to_internal_value(self, data):
+        slugs = dict.fromkeys(super().to_internal_value(data))
+        values = {slug: self.lookup(self.table, slug) for slug in slugs}
+        unknown = [slug for slug, value in values.items() if value is None]
+        if unknown:
+            raise serializers.ValidationError(
+                f'Неизвестные слаги: {", ".join(unknown)}'
+            )
+        return list(values.values())
+
+
 class TitleListRetrieveSerializer(serializers.ModelSerializer):
-    category = CategorySerializer()
-    genre = GenreSerializer(many=True)
+    category = CatalogueCategoryField()
+    genre = CatalogueGenresField()
     rating = serializers.IntegerField(default=None)
 
     class Meta:
@@ -43,15 +130,11 @@ class TitleListRetrieveSerializer(serializers.ModelSerializer):
 
 
 class TitleSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
+    category = CatalogueSlugRelatedField(
+        'category_slugs',
         queryset=Category.objects.all(),
-        slug_field='slug'
-    )
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(),
-        many=True,
-        slug_field='slug'
     )
+    genre = CatalogueSlugListField('genre_slugs')
 
     class Meta:
         model = Title
@@ -64,6 +147,21 @@ class TitleSerializer(serializers.ModelSerializer):
             )
         return value
 
+    @transaction.atomic
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        title = super().create(validated_data)
+        title.set_genres(genres, created=True)
+        return title
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        title = super().update(instance, validated_data)
+        if genres is not None:
+            title.set_genres(genres)
+        return title
+
     def to_representation(self, value):
         return TitleListRetrieveSerializer(value).data
 
@@ -88,7 +186,7 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         if (self.context['request'].method == 'POST' and Review.objects.filter(
-                author=self.context['request'].user,
+                author_id=self.context['request'].user.id,
                 title=self.context['request'].parser_context['kwargs'][
                     'title_id'])):
             raise serializers.ValidationError(
@@ -150,3 +248,97 @@ class GetTokenSerializer(serializers.Serializer, MeValidator):
     username = serializers.CharField(
         required=True,
     )
+
+
+class PurgeJobSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = PurgeJob
+        fields = (
+            'id', 'target', 'object_id', 'status', 'total', 'deleted',
+            'last_error', 'created_at', 'updated_at', 'finished_at',
+        )
+        read_only_fields = fields
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(required=True)
+    type = serializers.CharField(
+        required=False, default=','.join(KINDS)
+    )
+    limit = serializers.IntegerField(
+        required=False, default=10, min_value=1, max_value=50
+    )
+
+    def validate_type(self, value):
+        kinds = tuple(kind for kind in value.split(',') if kind)
+        unknown = set(kinds) - set(KINDS)
+        if unknown or not kinds:
+            raise serializers.ValidationError(
+                f'Допустимые типы: {", ".join(KINDS)}'
+            )
+        return kinds
+
+
+class TitleIdsSerializer(serializers.Serializer):
+    ids = serializers.CharField(required=True)
+
+    def validate_ids(self, value):
+        try:
+            ids = tuple(dict.fromkeys(
+                int(pk) for pk in value.split(',') if pk.strip()
+            ))
+        except ValueError:
+            raise serializers.ValidationError(
+                'Ожидается список id через запятую'
+            )
+        if not ids:
+            raise serializers.ValidationError('Список id пуст')
+        if len(ids) > settings.TITLE_BULK_MAX_IDS:
+            raise serializers.ValidationError(
+                f'Не больше {settings.TITLE_BULK_MAX_IDS} id за запрос'
+            )
+        return ids
+
+
+class BatchItemSerializer(serializers.Serializer):
+    METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+    EXCLUDED = ('batch',)
+    method = serializers.CharField()
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False, allow_null=True)
+
+    def validate_method(self, value):
+        if value.upper() not in self.METHODS:
+            raise serializers.ValidationError(
+                f'Допустимые методы: {", ".join(self.METHODS)}'
+            )
+        return value.upper()
+
+    def validate_path(self, value):
+        try:
+            match = resolve(value.partition('?')[0])
+        except Resolver404:
+            return value
+        if match.namespace != 'api' or match.url_name in self.EXCLUDED:
+            raise serializers.ValidationError(
+                'Допустимы только запросы к API, кроме batch'
+            )
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+
+    def to_internal_value(self, data):
+        # Размер пакета проверяется до разбора подзапросов: слишком большой
+        # пакет отклоняется без resolve() каждого пути.
+        requests = data.get('requests') if isinstance(data, dict) else None
+        if (
+            isinstance(requests, list)
+            and len(requests) > settings.BATCH_MAX_REQUESTS
+        ):
+            raise serializers.ValidationError({'requests': [
+                f'Не больше {settings.BATCH_MAX_REQUESTS} запросов в пакете'
+            ]})
+        return super().to_internal_value(data)
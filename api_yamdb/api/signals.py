@@ -0,0 +1,110 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import refresh_role_claims
+from .cache import (AUTHORS, CATALOGUE, COMMENT, COMMENTS, REVIEW, REVIEWS,
+                    TITLE, TITLE_COMMENTS, TITLE_LIST, USER, USERS, touch)
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.purge import is_purging, purge_finished
+from users.models import User
+
+
+def touch_on_commit(*names):
+    transaction.on_commit(lambda: touch(*names))
+
+
+def touch_titles(*title_ids):
+    touch_on_commit(TITLE_LIST, *[TITLE.format(pk) for pk in title_ids])
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def title_changed(sender, instance, **kwargs):
+    touch_titles(instance.pk)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def genre_title_changed(sender, instance, **kwargs):
+    if is_purging():
+        return
+    touch_titles(instance.title_id)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        touch_titles(instance.pk)
+    elif pk_set:
+        touch_titles(*pk_set)
+    else:
+        touch_titles()
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    if is_purging():
+        return
+    title_ids = [instance.title_id]
+    origin = getattr(instance, '_rating_origin', None)
+    if origin and origin[0] != instance.title_id:
+        title_ids.append(origin[0])
+    touch_titles(*title_ids)
+    touch_on_commit(
+        REVIEW.format(instance.pk),
+        *[REVIEWS.format(title_id) for title_id in title_ids]
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    if is_purging():
+        return
+    names = [COMMENT.format(instance.pk), COMMENTS.format(instance.review_id)]
+    title_id = instance.review.title_id if Comment.review.is_cached(
+        instance
+    ) else Review.objects.filter(
+        pk=instance.review_id
+    ).values_list('title_id', flat=True).first()
+    if title_id is not None:
+        names.append(TITLE_COMMENTS.format(title_id))
+    touch_on_commit(*names)
+
+
+@receiver(purge_finished)
+def purge_done(sender, job, title_ids, **kwargs):
+    touch(
+        TITLE_LIST, AUTHORS,
+        *[TITLE.format(pk) for pk in title_ids],
+        *[REVIEWS.format(pk) for pk in title_ids],
+        *[TITLE_COMMENTS.format(pk) for pk in title_ids],
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def catalogue_changed(sender, instance, **kwargs):
+    touch_on_commit(CATALOGUE)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, created=False, **kwargs):
+    if created:
+        touch_on_commit(USERS)
+        return
+    touch_on_commit(USERS, AUTHORS, USER.format(instance.pk))
+    # Роль и активность меняются и в админке, и из shell: уже выданные
+    # токены узнают об этом сразу, а не через ROLE_CLAIMS_MAX_AGE.
+    deleted = kwargs['signal'] is post_delete
+    transaction.on_commit(
+        lambda: refresh_role_claims(instance, deleted=deleted)
+    )
@@ -2,8 +2,9 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UsersViewSet,
-                    get_token_for_user, signup)
+                    PurgeJobViewSet, ReviewViewSet, TitleViewSet, UsersViewSet,
+                    batch, export, get_token_for_user, ingestion_stats,
+                    search, signup)
 
 app_name = 'api'
 
@@ -12,6 +13,7 @@ router_v1.register('titles', TitleViewSet, basename='titles')
 router_v1.register('categories', CategoryViewSet, basename='categories')
 router_v1.register('genres', GenreViewSet, basename='genres')
 router_v1.register('users', UsersViewSet, basename='users')
+router_v1.register('purges', PurgeJobViewSet, basename='purges')
 
 router_v1.register(
     r'titles/(?P<title_id>.+)/reviews',
@@ -28,4 +30,10 @@ urlpatterns = [
     path('', include(router_v1.urls)),
     path('auth/token/', get_token_for_user, name='token'),
     path('auth/signup/', signup, name='signup'),
+    path('search/', search, name='search'),
+    path('batch/', batch, name='batch'),
+    path('export/<slug:resource>/', export, name='export'),
+    path(
+        'reviews/ingestion/stats/', ingestion_stats, name='ingestion-stats'
+    ),
 ]
@@ -1,103 +1,259 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
 from django.db.utils import IntegrityError
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets, serializers
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       renderer_classes)
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 
-from .filters import TitleFilter
-from .mixins import CreateDestroyList
+from .authentication import get_access_token
+from .batch import execute_batch
+from .bulk import upsert_titles
+from .cache import (AUTHORS, CATALOGUE, COMMENT, COMMENTS, REVIEW, REVIEWS,
+                    TITLE, TITLE_LIST, USER, USERS, VersionedListMixin,
+                    VersionedReadMixin)
+from .cards import TitleCardMixin
+from .catalogue import GENRE_LINKS
+from .export import EXPORTS, stream_export
+from .filters import FullTextSearchFilter, TitleFilter
+from .includes import TitleIncludeMixin
+from .mixins import (BackgroundDestroyMixin, CreateDestroyList,
+                     KeysetPaginationMixin, ReplicaReadMixin,
+                     SparseFieldsMixin)
+from .parsers import NDJSONParser
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
                           IsAdminOrModeratorOrReadOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import (BatchSerializer, CategorySerializer,
+                          CommentSerializer,
                           GenreSerializer, GetTokenSerializer,
-                          ReviewSerializer, SignUpSerializer,
-                          TitleListRetrieveSerializer, TitleSerializer,
-                          UsersSerializer)
-from reviews.models import Category, Comment, Genre, Review, Title
+                          PurgeJobSerializer, ReviewSerializer,
+                          SearchQuerySerializer, SignUpSerializer,
+                          TitleIdsSerializer, TitleListRetrieveSerializer,
+                          TitleSerializer, UsersSerializer)
+from reviews import ingestion
+from reviews.models import (Category, Comment, Genre, PurgeJob, Review,
+                            Title)
+from reviews.search import (COMMENT_KIND, REVIEW_KIND, TITLE_KIND,
+                            get_backend)
 from users.models import User
+from users.outbox import enqueue_email
 
 
 @permission_classes([IsAdminOrReadOnly])
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
-    filter_backends = (DjangoFilterBackend, filters.OrderingFilter,)
+class TitleViewSet(ReplicaReadMixin, BackgroundDestroyMixin,
+                   VersionedReadMixin, TitleIncludeMixin, SparseFieldsMixin,
+                   TitleCardMixin, viewsets.ModelViewSet):
+    cache_responses = True
+    queryset = Title.objects.filter(is_hidden=False).prefetch_related(
+        GENRE_LINKS
+    )
+    filter_backends = (
+        DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter,
+    )
     filterset_class = TitleFilter
     ordering_fields = ('name', 'year', 'category', 'genre', 'rating',)
     ordering = ('name',)
+    sparse_fields = {
+        'id': (),
+        'name': ('name',),
+        'year': ('year',),
+        'description': ('description',),
+        'category': ('category',),
+        'genre': (),
+        'rating': ('rating',),
+    }
+    sparse_prefetch_related = {'genre': GENRE_LINKS}
+
+    def uses_cards(self, request):
+        return not self.get_sparse_fields() and super().uses_cards(request)
+
+    def get_list_versions(self):
+        return (CATALOGUE, TITLE_LIST)
+
+    def get_detail_versions(self):
+        return (
+            CATALOGUE, TITLE.format(self.get_version_id('pk')),
+            *self.get_include_versions(self.get_version_id('pk')),
+        )
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'bulk'):
             return TitleListRetrieveSerializer
         return TitleSerializer
 
+    @action(detail=False, url_path='bulk',
+            parser_classes=(JSONParser, NDJSONParser))
+    def bulk(self, request):
+        serializer = TitleIdsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        return self.versioned_response(
+            request, (CATALOGUE, *[TITLE.format(pk) for pk in ids]),
+            lambda: self.get_bulk_response(request, ids),
+        )
+
+    @bulk.mapping.post
+    def bulk_upsert(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise serializers.ValidationError({
+                'non_field_errors': ['Ожидается непустой список произведений']
+            })
+        if len(items) > settings.TITLE_BULK_MAX_ITEMS:
+            raise serializers.ValidationError({
+                'non_field_errors': [
+                    f'Не больше {settings.TITLE_BULK_MAX_ITEMS} произведений '
+                    'за запрос'
+                ]
+            })
+        return Response(upsert_titles(request, items))
+
 
 @permission_classes([IsAdminOrReadOnly])
-class CategoryViewSet(CreateDestroyList):
+class CategoryViewSet(VersionedListMixin, CreateDestroyList):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
+    def get_list_versions(self):
+        return (CATALOGUE,)
+
 
 @permission_classes([IsAdminOrReadOnly])
-class GenreViewSet(CreateDestroyList):
+class GenreViewSet(VersionedListMixin, CreateDestroyList):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
+    def get_list_versions(self):
+        return (CATALOGUE,)
+
 
 @permission_classes([IsAdminOrModeratorOrReadOnly])
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, KeysetPaginationMixin,
+                    VersionedReadMixin, SparseFieldsMixin,
+                    viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    sparse_fields = {
+        'id': (),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': (),
+    }
+    sparse_always = ('id', 'pub_date')
+    sparse_select_related = {'author': 'author'}
+
+    def get_list_versions(self):
+        return (REVIEWS.format(self.get_version_id('title_id')), AUTHORS)
+
+    def get_detail_versions(self):
+        return (REVIEW.format(self.get_version_id('pk')), AUTHORS)
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        return get_object_or_404(
+            Title, id=self.kwargs.get('title_id'), is_hidden=False
+        )
+
+    def create(self, request, *args, **kwargs):
+        if not ingestion.is_enabled():
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        title = self.get_title()
+        token = ingestion.submit(
+            title.id, request.user.id,
+            serializer.validated_data['text'],
+            serializer.validated_data['score'],
+        )
+        status_url = request.build_absolute_uri(reverse(
+            'api:reviews-submission',
+            kwargs={'title_id': title.id, 'token': token},
+        ))
+        return Response(
+            {'status': ingestion.PENDING, 'status_url': status_url},
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': status_url},
+        )
+
+    @action(detail=False, url_path=r'submissions/(?P<token>[0-9a-f]{32})')
+    def submission(self, request, title_id, token):
+        submission = ingestion.get_submission(token)
+        if submission is None:
+            raise NotFound('Заявка на отзыв не найдена')
+        return Response(submission)
 
     def perform_create(self, serializer):
         serializer.save(title=self.get_title(),
-                        author=self.request.user)
+                        author_id=self.request.user.id)
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
 
 
 @permission_classes([IsAdminOrModeratorOrReadOnly])
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, KeysetPaginationMixin,
+                     VersionedReadMixin, SparseFieldsMixin,
+                     viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    sparse_fields = {
+        'id': (),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': (),
+    }
+    sparse_always = ('id', 'pub_date')
+    sparse_select_related = {'author': 'author'}
+
+    def get_list_versions(self):
+        return (COMMENTS.format(self.get_version_id('review_id')), AUTHORS)
+
+    def get_detail_versions(self):
+        return (COMMENT.format(self.get_version_id('pk')), AUTHORS)
 
     def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+        return get_object_or_404(
+            Review, id=self.kwargs.get('review_id'), title__is_hidden=False
+        )
 
     def perform_create(self, serializer):
         serializer.save(review=self.get_review(),
-                        author=self.request.user)
+                        author_id=self.request.user.id)
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
 
 
 @permission_classes([IsAdmin])
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(BackgroundDestroyMixin, VersionedReadMixin,
+                   viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
-    queryset = User.objects.all()
+    queryset = User.objects.filter(is_hidden=False)
     serializer_class = UsersSerializer
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
     lookup_field = 'username'
 
+    def get_list_versions(self):
+        return (USERS,)
+
+    def get_detail_versions(self):
+        return (USERS,)
+
     @action(detail=False,
             methods=['patch', 'get'],
             url_path='me',
             permission_classes=[permissions.IsAuthenticated],
             )
     def me(self, request):
-        user = request.user
         if request.method == 'PATCH':
+            user = self.get_me()
             serializer = UsersSerializer(
                 user,
                 data=request.data,
@@ -105,9 +261,57 @@ class UsersViewSet(viewsets.ModelViewSet):
             )
             serializer.is_valid(raise_exception=True)
             serializer.save(role=user.role)
-        if request.method == 'GET':
-            serializer = UsersSerializer(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.versioned_response(
+            request, (USER.format(request.user.id),),
+            lambda: Response(
+                UsersSerializer(self.get_me()).data, status=status.HTTP_200_OK
+            )
+        )
+
+    def get_me(self):
+        user = self.request.user
+        if isinstance(user, User):
+            return user
+        return get_object_or_404(User, pk=user.id)
+
+    def get_version_scope(self, request):
+        if self.action == 'me':
+            return f'{request.path}:{request.user.id}'
+        return super().get_version_scope(request)
+
+
+@permission_classes([IsAdmin])
+class PurgeJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = PurgeJob.objects.all()
+    serializer_class = PurgeJobSerializer
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+@renderer_classes([NDJSONRenderer, CSVRenderer])
+def export(request, resource):
+    if resource not in EXPORTS:
+        raise NotFound()
+    return stream_export(request, resource)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def ingestion_stats(request):
+    return Response(ingestion.stats())
+
+
+@api_view(['POST'])
+def batch(request):
+    serializer = BatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    return Response(
+        {'results': execute_batch(
+            request, serializer.validated_data['requests']
+        )},
+        status=status.HTTP_200_OK
+    )
 
 
 @api_view(['POST'])
@@ -128,12 +332,10 @@ def signup(request):
         raise serializers.ValidationError(detail=[valid_error, ])
 
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    enqueue_email(
         'Подтверждение email',
         f'Ваш код подтверждения: {confirmation_code}',
-        from_email=settings.FROM_EMAIL,
-        recipient_list=[serializer.validated_data['email']],
-        fail_silently=True,
+        recipient=serializer.validated_data['email'],
     )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -143,9 +345,72 @@ def get_token_for_user(request):
     serializer = GetTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     user = get_object_or_404(
-        User, username=serializer.validated_data['username'])
+        User, username=serializer.validated_data['username'],
+        is_hidden=False)
     if default_token_generator.check_token(
             user, serializer.validated_data['confirmation_code']):
-        token = AccessToken.for_user(user)
+        token = get_access_token(user)
         return Response({"token": str(token)}, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+SEARCH_SOURCES = {
+    TITLE_KIND: (
+        Title.objects.filter(is_hidden=False).prefetch_related(GENRE_LINKS),
+        TitleListRetrieveSerializer,
+        lambda obj: reverse('api:titles-detail', kwargs={'pk': obj.pk}),
+    ),
+    REVIEW_KIND: (
+        Review.objects.filter(title__is_hidden=False).select_related(
+            'author'
+        ),
+        ReviewSerializer,
+        lambda obj: reverse('api:reviews-detail', kwargs={
+            'title_id': obj.title_id, 'pk': obj.pk
+        }),
+    ),
+    COMMENT_KIND: (
+        Comment.objects.filter(review__title__is_hidden=False).select_related(
+            'author', 'review'
+        ),
+        CommentSerializer,
+        lambda obj: reverse('api:comments-detail', kwargs={
+            'title_id': obj.review.title_id,
+            'review_id': obj.review_id,
+            'pk': obj.pk,
+        }),
+    ),
+}
+
+
+@api_view(['GET'])
+def search(request):
+    serializer = SearchQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    hits = get_backend().search(
+        serializer.validated_data['q'],
+        kinds=serializer.validated_data['type'],
+        limit=serializer.validated_data['limit'],
+    )
+    objects = {}
+    for kind, (queryset, _, _) in SEARCH_SOURCES.items():
+        ids = [object_id for hit_kind, object_id, _ in hits
+               if hit_kind == kind]
+        if ids:
+            objects[kind] = queryset.in_bulk(ids)
+    results = []
+    for kind, object_id, rank in hits:
+        obj = objects.get(kind, {}).get(object_id)
+        if obj is None:
+            continue
+        _, result_serializer, get_url = SEARCH_SOURCES[kind]
+        results.append({
+            'type': kind,
+            'rank': round(rank, 6),
+            'url': request.build_absolute_uri(get_url(obj)),
+            'object': result_serializer(obj).data,
+        })
+    return Response(
+        {'count': len(results), 'results': results},
+        status=status.HTTP_200_OK
+    )
@@ -5,3 +5,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
 application = get_asgi_application()
+
+from api.catalogue import catalogue  # noqa: E402
+from reviews.purge import purger  # noqa: E402
+
+catalogue.warm()
+purger.resume()
@@ -0,0 +1,81 @@
+import random
+import re
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE_PRAGMAS = (
+    'busy_timeout', 'journal_mode', 'synchronous', 'cache_size',
+    'mmap_size', 'temp_store', 'wal_autocheckpoint',
+)
+PRAGMA_VALUE_RE = re.compile(r'^-?\w+$')
+PRIMARY = 'default'
+
+read_database = ContextVar('read_database', default=None)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Применяет SQLITE_PRAGMAS к каждому новому соединению SQLite.
+
+    busy_timeout выставляется первым, чтобы смена journal_mode ждала
+    блокировку, а не падала с «database is locked».
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    unknown = set(pragmas) - set(SQLITE_PRAGMAS)
+    if unknown:
+        raise ImproperlyConfigured(
+            f'Неизвестные PRAGMA: {", ".join(sorted(unknown))}'
+        )
+    with connection.cursor() as cursor:
+        for name in (name for name in SQLITE_PRAGMAS if name in pragmas):
+            value = str(pragmas[name])
+            if not PRAGMA_VALUE_RE.match(value):
+                raise ImproperlyConfigured(
+                    f'Недопустимое значение PRAGMA {name}: {value!r}'
+                )
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def get_replica():
+    """Случайная реплика или основная база, если реплик нет."""
+    replicas = settings.DATABASE_REPLICAS
+    return random.choice(replicas) if replicas else PRIMARY
+
+
+def route_reads(alias):
+    """Направляет чтения текущего контекста в alias; вернёт токен сброса."""
+    return read_database.set(alias)
+
+
+def reset_reads(token):
+    read_database.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Запись всегда в основную базу, чтение туда, куда направил запрос.
+
+    Без route_reads чтение идёт в основную базу, поэтому команды,
+    админка и фоновые задачи не видят отставания реплик.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
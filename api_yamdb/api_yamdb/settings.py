@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 from os.path import dirname, join
 from pathlib import Path
@@ -68,9 +69,71 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+DATABASE_REPLICAS = [
+    alias for alias in os.getenv('DB_REPLICAS', '').split(',') if alias
+]
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db.{alias}.sqlite3',
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['api_yamdb.db.PrimaryReplicaRouter']
+REPLICA_STICKY_TIMEOUT = 10
+
+SQLITE_PRAGMAS = {
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'normal'),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64 * 1024)),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+}
+
+# Версии ответов, отзыв ролей и закрепление за основной базой должны
+# быть видны всем процессам сервера, поэтому кэш по умолчанию файловый;
+# для нескольких машин — Redis/Memcached через CACHE_BACKEND.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'api_yamdb_cache'),
+        ),
+    },
+}
+
+API_RESPONSE_CACHE_TIMEOUT = 60 * 10
+TITLE_CARD_TIMEOUT = 60 * 60
+INCLUDE_COMMENTS_LIMIT = 5
+TITLE_BULK_MAX_IDS = 100
+TITLE_BULK_MAX_ITEMS = 10000
+TITLE_BULK_CHUNK_SIZE = 500
+BATCH_MAX_REQUESTS = 20
+EXPORT_CHUNK_SIZE = 2000
+BATCH_MAX_WORKERS = 4
+
+REVIEW_INGESTION_MODE = os.getenv('REVIEW_INGESTION_MODE', 'direct')
+REVIEW_INGESTION_BATCH_SIZE = 200
+REVIEW_INGESTION_MAX_DELAY = 0.05
+REVIEW_SUBMISSION_TIMEOUT = 60 * 60
+
+PURGE_THRESHOLD = 1000
+PURGE_BATCH_SIZE = 500
+PURGE_PAUSE = 0.05
+PURGE_IN_BACKGROUND = True
+
+SEARCH_BACKEND = os.getenv(
+    'SEARCH_BACKEND', 'reviews.search.SQLiteFTSBackend'
+)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -108,7 +171,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.RoleJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.'
                                 'PageNumberPagination',
@@ -119,12 +182,19 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
     'AUTH_HEADER_TYPES': ('Bearer',),
     'TOKEN_TYPE_CLAIM': 'token_type',
-    'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
+    'TOKEN_USER_CLASS': 'api.authentication.RoleTokenUser',
 }
+ROLE_CLAIMS_MAX_AGE = timedelta(minutes=5)
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 FROM_EMAIL = 'YandexTeam@example.com'
+EMAIL_OUTBOX_EAGER = os.getenv('EMAIL_OUTBOX_EAGER', '') == '1'
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_BACKOFF = timedelta(seconds=30)
+EMAIL_OUTBOX_MAX_BACKOFF = timedelta(hours=1)
+EMAIL_OUTBOX_CLAIM_TIMEOUT = timedelta(minutes=10)
 
 USERNAME_MAX_LENGTH = 150
 EMAIL_MAX_LENGTH = 254
@@ -1,7 +1,39 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.models import Group
 
-from .models import Category, Comment, Genre, GenreTitle, Review, Title
+from .models import (Category, Comment, Genre, GenreTitle, PurgeJob, Review,
+                     ReviewSubmission, Title)
+from .search import COMMENT_KIND, REVIEW_KIND, TITLE_KIND, get_backend
+
+
+class FullTextSearchAdminMixin:
+    """
+    Поиск в админке через полнотекстовый индекс.
+
+    Показываются не больше search_limit самых релевантных объектов; если
+    результат обрезан, в списке выводится предупреждение.
+    """
+    search_kind = None
+    search_limit = 1000
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        ids = [
+            object_id for _, object_id, _ in get_backend().search(
+                search_term, kinds=(self.search_kind,),
+                limit=self.search_limit
+            )
+        ]
+        if len(ids) >= self.search_limit:
+            messages.warning(
+                request,
+                f'Показаны первые {self.search_limit} результатов поиска, '
+                'уточните запрос.',
+            )
+        return queryset.filter(pk__in=ids), False
 
 
 class GenreTitleTabular(admin.TabularInline):
@@ -9,11 +41,14 @@ class GenreTitleTabular(admin.TabularInline):
 
 
 @admin.register(Title)
-class TitleAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'name', 'category', 'year', 'get_genres')
+class TitleAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    list_display = (
+        'pk', 'name', 'category', 'year', 'get_genres', 'rating',
+    )
     list_filter = ('category',)
     list_editable = ('category', 'year',)
     search_fields = ('name',)
+    search_kind = TITLE_KIND
     empty_value_display = '-пусто-'
     inlines = [GenreTitleTabular, ]
 
@@ -41,18 +76,20 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'score', 'title', 'author')
     list_filter = ('pub_date',)
     search_fields = ('text',)
+    search_kind = REVIEW_KIND
     empty_value_display = '-пусто-'
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'review', 'author')
     list_filter = ('pub_date',)
     search_fields = ('text',)
+    search_kind = COMMENT_KIND
     empty_value_display = '-пусто-'
 
 
@@ -62,3 +99,35 @@ class GenreTitleAdmin(admin.ModelAdmin):
 
 
 admin.site.unregister(Group)
+
+
+@admin.register(PurgeJob)
+class PurgeJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'target', 'object_id', 'status', 'deleted', 'total',
+        'created_at', 'finished_at',
+    )
+    list_filter = ('status', 'target')
+    empty_value_display = '-пусто-'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ReviewSubmission)
+class ReviewSubmissionAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'token', 'title_id', 'author', 'status', 'batch_size',
+        'commit_ms', 'created_at', 'processed_at',
+    )
+    list_filter = ('status',)
+    empty_value_display = '-пусто-'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
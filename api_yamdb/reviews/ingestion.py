@@ -0,0 +1,167 @@
+import logging
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Review, ReviewSubmission, Title
+
+logger = logging.getLogger(__name__)
+
+DIRECT = 'direct'
+QUEUED = 'queued'
+
+PENDING = ReviewSubmission.PENDING
+CREATED = ReviewSubmission.CREATED
+REJECTED = ReviewSubmission.REJECTED
+
+DUPLICATE_ERROR = 'На одно произведение можно оставить лишь один отзыв!'
+TITLE_ERROR = 'Произведение не найдено'
+STATS_SIZE = 100
+
+
+def is_enabled():
+    return settings.REVIEW_INGESTION_MODE == QUEUED
+
+
+def submit(title_id, author_id, text, score):
+    """
+    Сохраняет проверенный отзыв в очередь и возвращает токен заявки.
+
+    Заявка записывается в БД до ответа 202, поэтому принятый отзыв
+    переживает перезапуск сервера и дождётся писателя.
+    """
+    token = uuid.uuid4().hex
+    ReviewSubmission.objects.create(
+        token=token, title_id=int(title_id), author_id=author_id,
+        text=text, score=score,
+    )
+    return token
+
+
+def get_submission(token):
+    submission = ReviewSubmission.objects.filter(token=token).first()
+    if submission is None:
+        return None
+    state = {'status': submission.status}
+    if submission.status == CREATED:
+        state['id'] = submission.review_id
+    elif submission.status == REJECTED:
+        state['errors'] = [submission.error]
+    if submission.status != PENDING:
+        state['batch_size'] = submission.batch_size
+        state['commit_ms'] = submission.commit_ms
+    return state
+
+
+def claim_batch(batch):
+    """
+    Помечает пачку ожидающих заявок первым оператором транзакции записи.
+
+    Блокировку записи SQLite писатель берёт сразу, а не при переходе от
+    чтения к записи; при сбое пометка откатывается вместе с пачкой.
+    """
+    ReviewSubmission.objects.filter(pk__in=ReviewSubmission.objects.filter(
+        status=PENDING
+    ).order_by('id').values('pk')[:settings.REVIEW_INGESTION_BATCH_SIZE]
+    ).update(batch=batch)
+    return list(ReviewSubmission.objects.filter(
+        status=PENDING, batch=batch
+    ).order_by('id'))
+
+
+def write_batch():
+    """
+    Записывает одну пачку заявок одной транзакцией, возвращает её размер.
+
+    Нарушение unique_review отклоняет только свой отзыв: каждый
+    сохраняется в отдельной точке сохранения.
+    """
+    batch = uuid.uuid4().hex
+    started = time.perf_counter()
+    with transaction.atomic():
+        submissions = claim_batch(batch)
+        if not submissions:
+            return 0
+        existing = set(Title.objects.filter(
+            pk__in={submission.title_id for submission in submissions},
+            is_hidden=False,
+        ).values_list('pk', flat=True))
+        for submission in submissions:
+            if submission.title_id not in existing:
+                submission.status, submission.error = REJECTED, TITLE_ERROR
+                continue
+            review = Review(
+                title_id=submission.title_id,
+                author_id=submission.author_id,
+                text=submission.text, score=submission.score,
+            )
+            try:
+                with transaction.atomic():
+                    review.save()
+            except IntegrityError:
+                submission.status = REJECTED
+                submission.error = DUPLICATE_ERROR
+            else:
+                submission.status, submission.review_id = CREATED, review.pk
+        commit_ms = round((time.perf_counter() - started) * 1000, 3)
+        now = timezone.now()
+        for submission in submissions:
+            submission.batch_size = len(submissions)
+            submission.commit_ms = commit_ms
+            submission.processed_at = now
+        ReviewSubmission.objects.bulk_update(submissions, [
+            'status', 'review_id', 'error', 'batch_size', 'commit_ms',
+            'processed_at',
+        ])
+    logger.info('Review batch of %d committed in %.3f ms',
+                len(submissions), commit_ms)
+    return len(submissions)
+
+
+def drain():
+    """Записывает пачки, пока есть заявки; возвращает число заявок."""
+    total = 0
+    while ReviewSubmission.objects.filter(status=PENDING).exists():
+        total += write_batch()
+    return total
+
+
+def delete_processed():
+    """Удаляет заявки, обработанные раньше REVIEW_SUBMISSION_TIMEOUT."""
+    deleted, _ = ReviewSubmission.objects.filter(
+        processed_at__lt=timezone.now() - timedelta(
+            seconds=settings.REVIEW_SUBMISSION_TIMEOUT
+        ),
+    ).delete()
+    return deleted
+
+
+def pending_count():
+    return ReviewSubmission.objects.filter(status=PENDING).count()
+
+
+def stats():
+    """Размер и время коммита последних пачек писателя."""
+    batches = list(ReviewSubmission.objects.exclude(
+        processed_at=None
+    ).values('batch').annotate(
+        size=Count('id'), latency=Max('commit_ms'),
+        finished=Max('processed_at'),
+    ).order_by('-finished')[:STATS_SIZE])
+    if not batches:
+        return {'batches': 0, 'pending': pending_count()}
+    latencies = sorted(batch['latency'] for batch in batches)
+    sizes = [batch['size'] for batch in batches]
+    return {
+        'batches': len(batches),
+        'reviews': sum(sizes),
+        'pending': pending_count(),
+        'avg_batch_size': sum(sizes) / len(sizes),
+        'avg_commit_ms': sum(latencies) / len(latencies),
+        'max_commit_ms': latencies[-1],
+    }
@@ -0,0 +1,218 @@
+import csv
+import datetime
+import gzip
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from reviews.management.commands.load_data import CHUNK_SIZE, DATA_DIR
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+# Файл, столбцы в порядке load_data и поля модели для них. Скрытые до
+# удаления произведения и пользователи вместе с зависимыми строками не
+# выгружаются.
+TABLES = {
+    'users': (
+        'users.csv',
+        lambda: User.objects.filter(is_hidden=False),
+        ('id', 'username', 'email', 'role', 'bio', 'first_name',
+         'last_name'),
+        ('id', 'username', 'email', 'role', 'bio', 'first_name',
+         'last_name'),
+    ),
+    'category': (
+        'category.csv',
+        lambda: Category.objects.all(),
+        ('id', 'name', 'slug'),
+        ('id', 'name', 'slug'),
+    ),
+    'genre': (
+        'genre.csv',
+        lambda: Genre.objects.all(),
+        ('id', 'name', 'slug'),
+        ('id', 'name', 'slug'),
+    ),
+    'titles': (
+        'titles.csv',
+        lambda: Title.objects.filter(is_hidden=False),
+        ('id', 'name', 'year', 'category', 'description'),
+        ('id', 'name', 'year', 'category_id', 'description'),
+    ),
+    'genre_title': (
+        'genre_title.csv',
+        lambda: GenreTitle.objects.filter(title__is_hidden=False),
+        ('id', 'title_id', 'genre_id'),
+        ('id', 'title_id', 'genre_id'),
+    ),
+    'review': (
+        'review.csv',
+        lambda: Review.objects.filter(
+            title__is_hidden=False, author__is_hidden=False
+        ),
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date'),
+    ),
+    'comments': (
+        'comments.csv',
+        lambda: Comment.objects.filter(
+            review__title__is_hidden=False,
+            review__author__is_hidden=False,
+            author__is_hidden=False,
+        ),
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        ('id', 'review_id', 'text', 'author_id', 'pub_date'),
+    ),
+}
+# Сколько прочитанных пачек строк ждут записи в файл одной таблицы.
+QUEUE_SIZE = 4
+ABORTED = object()
+
+
+def to_csv_value(value):
+    """Даты в формате исходных CSV: UTC с миллисекундами и суффиксом Z."""
+    if isinstance(value, datetime.datetime):
+        value = value.astimezone(datetime.timezone.utc)
+        return value.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    return '' if value is None else value
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка данных в .csv файлы в формате load_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=DATA_DIR,
+            help='Каталог для .csv файлов',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Количество строк, читаемых из БД за один раз',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Количество потоков, параллельно пишущих и сжимающих файлы',
+        )
+        parser.add_argument(
+            '--compress', action='store_true',
+            help='Сжимать файлы gzip (.csv.gz); load_data читает их сам',
+        )
+        parser.add_argument(
+            'tables', nargs='*',
+            help=f'Таблицы для выгрузки: {", ".join(TABLES)} (по умолчанию '
+                 'все)',
+        )
+
+    def _open(self, path):
+        if self.compress:
+            return gzip.open(path, 'wt', encoding='utf-8', newline='')
+        return open(path, 'w', encoding='utf-8', newline='')
+
+    def _write(self, name, chunks):
+        filename, _, columns, _ = TABLES[name]
+        if self.compress:
+            filename += '.gz'
+        path = os.path.join(self.path, filename)
+        temporary_path = f'{path}.tmp'
+        started = time.monotonic()
+        count = 0
+        try:
+            with self._open(temporary_path) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(columns)
+                for rows in iter(chunks.get, None):
+                    if rows is ABORTED:
+                        raise CommandError(f'Reading {name} failed')
+                    writer.writerows(
+                        [to_csv_value(value) for value in row]
+                        for row in rows
+                    )
+                    count += len(rows)
+            os.replace(temporary_path, path)
+            if self.compress and os.path.exists(path[:-len('.gz')]):
+                # load_data предпочитает несжатый файл, если он есть.
+                os.remove(path[:-len('.gz')])
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Data for the {name} table is dumped to {filename}! '
+            f'{count} rows in {elapsed:.2f}s '
+            f'({count / max(elapsed, 1e-6):.0f} rows/s)'
+        )
+
+    def _put(self, chunks, future, rows):
+        """Ждёт места в очереди, пока записывающий поток жив."""
+        while True:
+            try:
+                chunks.put(rows, timeout=0.1)
+                return
+            except queue.Full:
+                if future.done():
+                    future.result()
+                    raise
+
+    def _read(self, name, chunks, future):
+        _, get_queryset, _, fields = TABLES[name]
+        rows = []
+        try:
+            for row in get_queryset().order_by('pk').values_list(
+                *fields
+            ).iterator(chunk_size=self.chunk_size):
+                rows.append(row)
+                if len(rows) == self.chunk_size:
+                    self._put(chunks, future, rows)
+                    rows = []
+            if rows:
+                self._put(chunks, future, rows)
+        except BaseException:
+            with suppress(Exception):
+                self._put(chunks, future, ABORTED)
+            raise
+        self._put(chunks, future, None)
+
+    def handle(self, *args, **options):
+        self.path = options['path']
+        self.chunk_size = options['chunk_size']
+        self.compress = options['compress']
+        os.makedirs(self.path, exist_ok=True)
+        names = options['tables'] or list(TABLES)
+        unknown = set(names) - set(TABLES)
+        if unknown:
+            raise CommandError(
+                f'Unknown tables: {", ".join(sorted(unknown))}'
+            )
+        # Все таблицы читаются по очереди одним соединением в одной
+        # транзакции, чтобы внешние ключи выгрузки сходились; потоки
+        # только пишут и сжимают файлы.
+        futures = {}
+        with ThreadPoolExecutor(
+            max_workers=max(options['workers'], 1)
+        ) as executor, transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, '
+                        'READ ONLY'
+                    )
+            for name in names:
+                chunks = queue.Queue(maxsize=QUEUE_SIZE)
+                future = executor.submit(self._write, name, chunks)
+                futures[future] = name
+                try:
+                    self._read(name, chunks, future)
+                except Exception as error:
+                    raise CommandError(
+                        f'Dumping {name} failed: {error}'
+                    ) from error
+        for future, name in futures.items():
+            if future.exception() is not None:
+                raise CommandError(
+                    f'Dumping {name} failed: {future.exception()}'
+                ) from future.exception()
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from reviews.ingestion import delete_processed, drain
+
+
+class Command(BaseCommand):
+    help = (
+        'Запись отзывов, принятых в режиме REVIEW_INGESTION_MODE=queued, '
+        'пачками; запускается в одном экземпляре'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Записать накопившиеся отзывы один раз и завершиться',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Пауза между проверками очереди, секунд (по умолчанию '
+                 'REVIEW_INGESTION_MAX_DELAY)',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        if interval is None:
+            interval = settings.REVIEW_INGESTION_MAX_DELAY
+        while True:
+            try:
+                written = drain()
+                delete_processed()
+            except Exception as error:
+                self.stderr.write(f'Review batch failed: {error!r}')
+                written = 0
+            finally:
+                connection.close()
+            if written:
+                self.stdout.write(f'Written {written} submissions')
+            if options['once']:
+                return
+            if not written:
+                time.sleep(interval)
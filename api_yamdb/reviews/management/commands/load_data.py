@@ -1,129 +1,276 @@
 import csv
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from itertools import islice
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.search import get_backend
 from users.models import User
 
+DATA_DIR = 'static/data'
+CHUNK_SIZE = 5000
+CHECKPOINT_DIR = os.path.join(tempfile.gettempdir(), 'api_yamdb_load_data')
+
+STEPS = {
+    'users': ('_load_user', ()),
+    'category': ('_load_category', ()),
+    'genre': ('_load_genre', ()),
+    'titles': ('_load_title', ('category',)),
+    'genre_title': ('_load_genretitle', ('titles', 'genre')),
+    'review': ('_load_review', ('titles', 'users')),
+    'comments': ('_load_comment', ('review', 'users')),
+}
+
+
+@contextmanager
+def preserved_pub_date(model):
+    """Отключает auto_now_add, чтобы bulk_create сохранил pub_date из CSV."""
+    field = model._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class OffsetLines:
+    """Построчное чтение файла с учётом смещения в байтах.
+
+    csv.reader запрашивает строки только по мере разбора записи, поэтому
+    после каждой записи offset указывает ровно на начало следующей.
+    """
+
+    def __init__(self, binary_file):
+        self.file = binary_file
+        self.offset = binary_file.tell()
+
+    def seek(self, offset):
+        self.file.seek(offset)
+        self.offset = offset
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.file.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode('utf-8')
+
+
+def get_checkpoint_path(path):
+    """
+    Файл прогресса по умолчанию: во временном каталоге, а не рядом с CSV.
+
+    Каталог данных входит в репозиторий, поэтому прогресс хранится вне
+    его; имя зависит от каталога, чтобы загрузки разных данных не
+    смешивались.
+    """
+    digest = hashlib.sha1(
+        os.path.abspath(path).encode('utf-8')
+    ).hexdigest()[:16]
+    return os.path.join(CHECKPOINT_DIR, f'{digest}.json')
+
+
+class Checkpoint:
+    """Смещения загруженных байт по файлам, сохраняемые после каждой пачки."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.offsets = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as checkpoint_file:
+                self.offsets = json.load(checkpoint_file)
+
+    def get(self, filename):
+        with self.lock:
+            return self.offsets.get(filename, 0)
+
+    def save(self, filename, offset):
+        with self.lock:
+            self.offsets[filename] = offset
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temporary_path = f'{self.path}.tmp'
+            with open(temporary_path, 'w', encoding='utf-8') as tmp:
+                json.dump(self.offsets, tmp)
+            os.replace(temporary_path, self.path)
+
+    def clear(self):
+        with self.lock:
+            self.offsets = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
 
 class Command(BaseCommand):
     help = 'Загрузка данных из .csv файлов'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=DATA_DIR,
+            help='Каталог с .csv файлами',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Количество строк в одном bulk_create',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Количество таблиц, загружаемых параллельно',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с прогрессом загрузки (по умолчанию во временном '
+                 f'каталоге {CHECKPOINT_DIR})',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Игнорировать сохранённый прогресс и начать заново',
+        )
+
+    def _open(self, filename):
+        """Файл filename или его сжатая dump_data --compress копия .gz."""
+        path = os.path.join(self.path, filename)
+        if not os.path.exists(path) and os.path.exists(f'{path}.gz'):
+            return gzip.open(f'{path}.gz', 'rb')
+        return open(path, 'rb')
+
+    def _load(self, filename, model, make_object):
+        started = time.monotonic()
+        count = 0
+        with self._open(filename) as csvfile:
+            lines = OffsetLines(csvfile)
+            fieldnames = next(csv.reader(lines))
+            resumed_from = self.checkpoint.get(filename)
+            if resumed_from > lines.offset:
+                lines.seek(resumed_from)
+            ignore_conflicts = resumed_from > 0
+            reader = csv.DictReader(lines, fieldnames=fieldnames)
+            while True:
+                object_list = [
+                    make_object(row)
+                    for row in islice(reader, self.chunk_size)
+                ]
+                if not object_list:
+                    break
+                with self.write_lock, transaction.atomic():
+                    model.objects.bulk_create(
+                        objs=object_list,
+                        ignore_conflicts=ignore_conflicts,
+                    )
+                self.checkpoint.save(filename, lines.offset)
+                ignore_conflicts = False
+                count += len(object_list)
+        elapsed = time.monotonic() - started
+        resumed = f', resumed at byte {resumed_from}' if resumed_from else ''
+        self.stdout.write(
+            f'Data for the {model.__name__} table is loaded! '
+            f'{count} rows in {elapsed:.2f}s '
+            f'({count / max(elapsed, 1e-6):.0f} rows/s{resumed})'
+        )
+
     def _load_user(self):
-        with open(
-                'static/data/users.csv',
-                encoding='utf-8'
-        ) as csvfile:
-            reader = csv.DictReader(csvfile)
-            object_list = []
-            for row in reader:
-                object_list.append(User(**row))
-            User.objects.bulk_create(objs=object_list)
-        self.stdout.write('Data for the User table is loaded!')
+        self._load('users.csv', User, lambda row: User(**row))
 
     def _load_category(self):
-        with open(
-                'static/data/category.csv',
-                encoding='utf-8'
-        ) as csvfile:
-            reader = csv.DictReader(csvfile)
-            object_list = []
-            for row in reader:
-                object_list.append(Category(**row))
-            Category.objects.bulk_create(objs=object_list)
-        self.stdout.write('Data for the Category table is loaded!')
+        self._load('category.csv', Category, lambda row: Category(**row))
 
     def _load_genre(self):
-        with open(
-                'static/data/genre.csv',
-                encoding='utf-8'
-        ) as csvfile:
-            reader = csv.DictReader(csvfile)
-            object_list = []
-            for row in reader:
-                object_list.append(Genre(**row))
-            Genre.objects.bulk_create(objs=object_list)
-        self.stdout.write('Data for the Genre table is loaded!')
+        self._load('genre.csv', Genre, lambda row: Genre(**row))
 
     def _load_title(self):
-        with open(
-                'static/data/titles.csv',
-                encoding='utf-8'
-        ) as csvfile:
-            reader = csv.DictReader(csvfile)
-            object_list = []
-            for row in reader:
-                object_list.append(Title(
-                    pk=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category=Category.objects.get(pk=row['category']),
-                ))
-            Title.objects.bulk_create(objs=object_list)
-        self.stdout.write('Data for the Title table is loaded!')
+        self._load('titles.csv', Title, lambda row: Title(
+            pk=row['id'],
+            name=row['name'],
+            year=row['year'],
+            category_id=row['category'],
+            description=row.get('description') or None,
+        ))
 
     def _load_genretitle(self):
-        with open(
-                'static/data/genre_title.csv',
-                encoding='utf-8'
-        ) as csvfile:
-            reader = csv.DictReader(csvfile)
-            object_list = []
-            for row in reader:
-                object_list.append(GenreTitle(
-                    pk=row['id'],
-                    genre=Genre.objects.get(pk=row['genre_id']),
-                    title=Title.objects.get(pk=row['title_id']),
-                ))
-            GenreTitle.objects.bulk_create(objs=object_list)
-        self.stdout.write('Data for the GenreTitle table is loaded!')
+        self._load('genre_title.csv', GenreTitle, lambda row: GenreTitle(
+            pk=row['id'],
+            genre_id=row['genre_id'],
+            title_id=row['title_id'],
+        ))
 
     def _load_review(self):
-        with open(
-                'static/data/review.csv',
-                encoding='utf-8'
-        ) as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                data = Review(
-                    pk=row['id'],
-                    title=Title.objects.get(pk=row['title_id']),
-                    text=row['text'],
-                    author=User.objects.get(pk=row['author']),
-                    score=row['score'],
-                    pub_date=row['pub_date'],
-                )
-                data.save()
-                Review.objects.filter(
-                    pk=row['id']).update(pub_date=row['pub_date']
-                                         )
-        self.stdout.write('Data for the Review table is loaded!')
+        with preserved_pub_date(Review):
+            self._load('review.csv', Review, lambda row: Review(
+                pk=row['id'],
+                title_id=row['title_id'],
+                text=row['text'],
+                author_id=row['author'],
+                score=row['score'],
+                pub_date=row['pub_date'],
+            ))
+        with self.write_lock:
+            Title.rebuild_ratings()
 
     def _load_comment(self):
-        with open(
-                'static/data/comments.csv',
-                encoding='utf-8'
-        ) as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                data = Comment(
-                    pk=row['id'],
-                    review=Review.objects.get(pk=row['review_id']),
-                    text=row['text'],
-                    author=User.objects.get(pk=row['author']),
-                    pub_date=row['pub_date'],
-                )
-                data.save()
-                Comment.objects.filter(
-                    pk=row['id']).update(pub_date=row['pub_date']
-                                         )
-        self.stdout.write('Data for the Comment table is loaded!')
+        with preserved_pub_date(Comment):
+            self._load('comments.csv', Comment, lambda row: Comment(
+                pk=row['id'],
+                review_id=row['review_id'],
+                text=row['text'],
+                author_id=row['author'],
+                pub_date=row['pub_date'],
+            ))
+
+    def _run_step(self, name):
+        try:
+            getattr(self, STEPS[name][0])()
+        finally:
+            connection.close()
+
+    def _run_steps(self, workers):
+        done, running = set(), {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while len(done) < len(STEPS):
+                for name, (_, dependencies) in STEPS.items():
+                    if (
+                        name not in done
+                        and name not in running.values()
+                        and set(dependencies) <= done
+                    ):
+                        running[executor.submit(self._run_step, name)] = name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        wait(running)
+                        raise CommandError(
+                            f'Loading {name} failed: {future.exception()}'
+                        ) from future.exception()
+                    done.add(name)
 
     def handle(self, *args, **options):
-        self._load_user()
-        self._load_category()
-        self._load_genre()
-        self._load_title()
-        self._load_genretitle()
-        self._load_review()
-        self._load_comment()
+        self.path = options['path']
+        self.chunk_size = options['chunk_size']
+        self.checkpoint = Checkpoint(
+            options['checkpoint'] or get_checkpoint_path(self.path)
+        )
+        if options['restart']:
+            self.checkpoint.clear()
+        # SQLite допускает одного писателя: потоки параллельно читают CSV,
+        # а пачки записывают по очереди.
+        self.write_lock = (
+            threading.Lock() if connection.vendor == 'sqlite'
+            else nullcontext()
+        )
+        self._run_steps(max(options['workers'], 1))
+        self.checkpoint.clear()
+        get_backend().rebuild()
+        self.stdout.write('Search index is rebuilt!')
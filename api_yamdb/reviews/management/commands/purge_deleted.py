@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import PurgeJob
+from reviews.purge import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = 'Фоновое удаление скрытых произведений и пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить и задачи, прерванные в статусе «выполняется»',
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Повторить задачи, завершившиеся ошибкой; уже удалённые '
+                 'записи не пересчитываются',
+        )
+
+    def handle(self, *args, **options):
+        statuses = [PurgeJob.PENDING]
+        if options['resume']:
+            statuses.append(PurgeJob.RUNNING)
+        if options['retry_failed']:
+            statuses.append(PurgeJob.FAILED)
+        job_ids = PurgeJob.objects.filter(
+            status__in=statuses
+        ).values_list('pk', flat=True)
+        for job_id in list(job_ids):
+            if not claim_job(job_id, statuses):
+                continue
+            job = PurgeJob.objects.get(pk=job_id)
+            done = run_job(job)
+            self.stdout.write(
+                f'{job.target} {job.object_id}: '
+                f'{"purged" if done else "failed"} ({job.deleted} rows)'
+            )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reviews.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестроение полнотекстового индекса'
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(
+            f'Search index is rebuilt ({type(backend).__name__})!'
+        )
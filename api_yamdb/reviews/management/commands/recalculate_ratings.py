@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт рейтинга произведений по таблице отзывов'
+
+    def handle(self, *args, **options):
+        updated = Title.rebuild_ratings()
+        self.stdout.write(f'Ratings are recalculated for {updated} titles!')
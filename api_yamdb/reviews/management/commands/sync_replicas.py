@@ -0,0 +1,39 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api_yamdb.db import PRIMARY
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирование основной SQLite-базы в файлы реплик '
+        '(локальная замена репликации СУБД)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=1024,
+            help='Страниц за шаг копирования; между шагами запись открыта',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены (DB_REPLICAS)')
+        primary = connections[PRIMARY]
+        if primary.vendor != 'sqlite':
+            raise CommandError(
+                'Команда копирует только SQLite, для других СУБД '
+                'используйте их репликацию'
+            )
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            connections[alias].close()
+            target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+            try:
+                primary.connection.backup(target, pages=options['pages'])
+            finally:
+                target.close()
+            self.stdout.write(f'Replica {alias} is synced!')
@@ -1,6 +1,12 @@
+from collections import defaultdict
+
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.conf import settings
 from django.db import models
+from django.db.models import (Avg, Case, Count, ExpressionWrapper, F,
+                              FloatField, OuterRef, Q, Subquery, Sum, Value,
+                              When)
+from django.db.models.functions import Cast, Coalesce
 
 from reviews.validators import validate_year
 from users.models import User
@@ -77,15 +83,115 @@ class Title(models.Model):
         blank=True,
     )
     genre = models.ManyToManyField(Genre, through='GenreTitle')
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    is_hidden = models.BooleanField(
+        'Скрыто до удаления',
+        default=False,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(fields=['category', 'name'],
+                         name='title_category_name_idx'),
+        ]
 
     def __str__(self):
         return self.name[:30]
 
+    def set_genres(self, genres, created=False):
+        """
+        Приводит жанры произведения к genres: лишние связи удаляются одним
+        запросом, недостающие добавляются одним bulk_create.
+        """
+        Title.set_genres_many({self: genres}, created=created)
+
+    @staticmethod
+    def set_genres_many(genres, created=False):
+        """
+        То же для нескольких произведений сразу: genres сопоставляет
+        произведению список его жанров.
+        """
+        wanted = {
+            title.pk: list(dict.fromkeys(genre.pk for genre in title_genres))
+            for title, title_genres in genres.items()
+        }
+        existing = defaultdict(dict)
+        if not created:
+            for title_id, genre_id, pk in GenreTitle.objects.filter(
+                title_id__in=wanted
+            ).values_list('title_id', 'genre_id', 'pk'):
+                existing[title_id][genre_id] = pk
+        stale = [
+            pk for title_id, links in existing.items()
+            for genre_id, pk in links.items()
+            if genre_id not in wanted[title_id]
+        ]
+        if stale:
+            GenreTitle.objects.filter(pk__in=stale).delete()
+        GenreTitle.objects.bulk_create([
+            GenreTitle(title_id=title_id, genre_id=genre_id)
+            for title_id, genre_ids in wanted.items()
+            for genre_id in genre_ids if genre_id not in existing[title_id]
+        ])
+
+    @classmethod
+    def shift_rating(cls, title_id, score_delta, count_delta):
+        """Сдвигает сумму оценок и число отзывов одним UPDATE."""
+        count = F('review_count') + count_delta
+        cls.objects.filter(pk=title_id).update(
+            score_sum=F('score_sum') + score_delta,
+            review_count=count,
+            rating=Case(
+                When(Q(review_count__lte=-count_delta), then=None),
+                default=ExpressionWrapper(
+                    Cast(F('score_sum') + score_delta, FloatField()) / count,
+                    output_field=FloatField(),
+                ),
+                output_field=FloatField(),
+            ),
+        )
+
+    @classmethod
+    def rebuild_ratings(cls):
+        """Пересчитывает рейтинг всех произведений по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return cls.objects.update(
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                Value(0),
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                Value(0),
+            ),
+            rating=Subquery(
+                reviews.annotate(avg=Avg('score')).values('avg')
+            ),
+        )
+
 
 class GenreTitle(models.Model):
     title = models.ForeignKey(
@@ -103,6 +209,12 @@ class GenreTitle(models.Model):
         verbose_name = 'Произведение и жанр'
         verbose_name_plural = 'Произведения и жанры'
         ordering = ('id',)
+        indexes = [
+            models.Index(fields=['genre', 'title'],
+                         name='genretitle_genre_title_idx'),
+            models.Index(fields=['title', 'genre'],
+                         name='genretitle_title_genre_idx'),
+        ]
 
     def __str__(self):
         return (
@@ -134,6 +246,10 @@ class Review(ReviewCommentBaseModel):
             models.UniqueConstraint(fields=['title', 'author'],
                                     name='unique_review')
         ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+        ]
 
 
 class Comment(ReviewCommentBaseModel):
@@ -147,3 +263,92 @@ class Comment(ReviewCommentBaseModel):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx'),
+        ]
+
+
+class PurgeJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Завершено'),
+        (FAILED, 'Ошибка'),
+    )
+    TITLE = 'title'
+    USER = 'user'
+    TARGETS = (
+        (TITLE, 'Произведение'),
+        (USER, 'Пользователь'),
+    )
+    target = models.CharField(
+        'Объект', max_length=max([len(value) for value, name in TARGETS]),
+        choices=TARGETS,
+    )
+    object_id = models.PositiveBigIntegerField('id объекта')
+    status = models.CharField(
+        'Статус', max_length=max([len(value) for value, name in STATUSES]),
+        choices=STATUSES, default=PENDING,
+    )
+    total = models.PositiveIntegerField('Зависимых записей', default=0)
+    deleted = models.PositiveIntegerField('Удалено записей', default=0)
+    last_error = models.TextField('Ошибка', blank=True, default='')
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    updated_at = models.DateTimeField('Обновлено', auto_now=True)
+    finished_at = models.DateTimeField('Завершено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Фоновое удаление'
+        verbose_name_plural = 'Фоновые удаления'
+        ordering = ('id',)
+
+    def __str__(self):
+        return f'{self.target} {self.object_id}: {self.status}'
+
+
+class ReviewSubmission(models.Model):
+    """Отзыв, принятый в режиме отложенной записи и ожидающий писателя."""
+    PENDING = 'pending'
+    CREATED = 'created'
+    REJECTED = 'rejected'
+    STATUSES = (
+        (PENDING, 'Ожидает записи'),
+        (CREATED, 'Записан'),
+        (REJECTED, 'Отклонён'),
+    )
+    token = models.CharField('Токен', max_length=32, unique=True)
+    title_id = models.PositiveBigIntegerField('id произведения')
+    author = models.ForeignKey(
+        User, verbose_name='Автор', on_delete=models.CASCADE,
+        related_name='review_submissions',
+    )
+    text = models.TextField('Текст')
+    score = models.PositiveSmallIntegerField('Оценка')
+    status = models.CharField(
+        'Статус', max_length=max([len(value) for value, name in STATUSES]),
+        choices=STATUSES, default=PENDING,
+    )
+    review_id = models.PositiveBigIntegerField('id отзыва', null=True)
+    error = models.TextField('Ошибка', blank=True, default='')
+    batch = models.CharField('Пачка', max_length=32, blank=True, default='')
+    batch_size = models.PositiveIntegerField('Размер пачки', null=True)
+    commit_ms = models.FloatField('Время коммита, мс', null=True)
+    created_at = models.DateTimeField('Принят', auto_now_add=True)
+    processed_at = models.DateTimeField('Обработан', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Заявка на отзыв'
+        verbose_name_plural = 'Заявки на отзывы'
+        ordering = ('id',)
+        indexes = [
+            models.Index(fields=['status', 'id'],
+                         name='review_submission_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.token}: {self.status}'
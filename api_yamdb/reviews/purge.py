@@ -0,0 +1,208 @@
+import logging
+import queue
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Comment, GenreTitle, PurgeJob, Review, Title
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+# Пока идёт задача, построчные сигналы удаления не сдвигают версии
+# ответов; по её завершении purge_finished отправляется один раз с
+# произведениями, чьи отзывы и комментарии были удалены.
+purging = ContextVar('purging', default=False)
+purge_finished = Signal()
+
+TARGET_MODELS = {
+    PurgeJob.TITLE: Title,
+    PurgeJob.USER: User,
+}
+
+
+def get_target(instance):
+    for target, model in TARGET_MODELS.items():
+        if isinstance(instance, model):
+            return target
+    raise TypeError(f'Нельзя удалить в фоне: {instance!r}')
+
+
+def get_dependents(target, object_id):
+    """Зависимые записи в порядке удаления: сначала листья каскада."""
+    if target == PurgeJob.TITLE:
+        return [
+            Comment.objects.filter(review__title_id=object_id),
+            Review.objects.filter(title_id=object_id),
+            GenreTitle.objects.filter(title_id=object_id),
+        ]
+    return [
+        Comment.objects.filter(review__author_id=object_id),
+        Comment.objects.filter(author_id=object_id),
+        Review.objects.filter(author_id=object_id),
+    ]
+
+
+def is_purging():
+    return purging.get()
+
+
+def get_affected_titles(target, object_id):
+    """Произведения, чьи отзывы, комментарии и рейтинг затронет задача."""
+    if target == PurgeJob.TITLE:
+        return {object_id}
+    return set(Review.objects.filter(
+        author_id=object_id
+    ).values_list('title_id', flat=True)) | set(Comment.objects.filter(
+        author_id=object_id
+    ).values_list('review__title_id', flat=True))
+
+
+def count_dependents(instance):
+    return sum(
+        queryset.count()
+        for queryset in get_dependents(get_target(instance), instance.pk)
+    )
+
+
+def is_heavy(instance):
+    return count_dependents(instance) > settings.PURGE_THRESHOLD
+
+
+def hide(instance):
+    instance.is_hidden = True
+    if isinstance(instance, User):
+        instance.is_active = False
+        instance.save(update_fields=['is_hidden', 'is_active'])
+    else:
+        instance.save(update_fields=['is_hidden'])
+
+
+def schedule_purge(instance):
+    """
+    Скрывает объект сразу и ставит удаление зависимых записей в очередь.
+
+    Сам объект удаляется последним, когда зависимых записей не осталось.
+    """
+    with transaction.atomic():
+        hide(instance)
+        job = PurgeJob.objects.create(
+            target=get_target(instance),
+            object_id=instance.pk,
+            total=count_dependents(instance),
+        )
+    if settings.PURGE_IN_BACKGROUND:
+        transaction.on_commit(lambda: purger.submit(job.pk))
+    return job
+
+
+def claim_job(job_id, statuses=(PurgeJob.PENDING,)):
+    """
+    Переводит задачу в статус «выполняется», если она в одном из statuses.
+
+    Задачу с ошибкой можно взять повторно: удаление продолжится с места
+    сбоя, а прежняя ошибка сбрасывается.
+    """
+    return PurgeJob.objects.filter(
+        pk=job_id, status__in=statuses
+    ).update(
+        status=PurgeJob.RUNNING, last_error='', updated_at=timezone.now()
+    ) == 1
+
+
+def delete_batch(job, queryset):
+    with transaction.atomic():
+        pks = list(
+            queryset.order_by().values_list('pk', flat=True)[
+                :settings.PURGE_BATCH_SIZE
+            ]
+        )
+        if not pks:
+            return 0
+        deleted, _ = queryset.model.objects.filter(pk__in=pks).delete()
+        job.deleted = min(job.deleted + deleted, job.total)
+        PurgeJob.objects.filter(pk=job.pk).update(
+            deleted=job.deleted, updated_at=timezone.now(),
+        )
+    return deleted
+
+
+def run_job(job):
+    """Удаляет зависимые записи пачками по PURGE_BATCH_SIZE, затем объект."""
+    token = purging.set(True)
+    try:
+        title_ids = get_affected_titles(job.target, job.object_id)
+        for queryset in get_dependents(job.target, job.object_id):
+            while delete_batch(job, queryset):
+                time.sleep(settings.PURGE_PAUSE)
+        TARGET_MODELS[job.target].objects.filter(pk=job.object_id).delete()
+    except Exception as error:
+        logger.exception('Purge job %s failed', job.pk)
+        PurgeJob.objects.filter(pk=job.pk).update(
+            status=PurgeJob.FAILED, last_error=repr(error),
+            updated_at=timezone.now(),
+        )
+        return False
+    finally:
+        purging.reset(token)
+    PurgeJob.objects.filter(pk=job.pk).update(
+        status=PurgeJob.DONE, deleted=job.total,
+        finished_at=timezone.now(), updated_at=timezone.now(),
+    )
+    purge_finished.send(sender=PurgeJob, job=job, title_ids=title_ids)
+    return True
+
+
+class Purger:
+    """Фоновый поток, выполняющий задачи удаления по одной."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, job_id):
+        self.queue.put(job_id)
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='purger', daemon=True
+                )
+                self.thread.start()
+
+    def flush(self):
+        self.queue.join()
+
+    def resume(self):
+        """
+        Ставит в очередь задачи, ожидавшие до перезапуска процесса.
+
+        Задачи, прерванные в статусе «выполняется», продолжает
+        purge_deleted --resume.
+        """
+        if not settings.PURGE_IN_BACKGROUND:
+            return
+        for job_id in PurgeJob.objects.filter(
+            status=PurgeJob.PENDING
+        ).values_list('pk', flat=True):
+            self.submit(job_id)
+
+    def run(self):
+        while True:
+            job_id = self.queue.get()
+            close_old_connections()
+            try:
+                if claim_job(job_id):
+                    run_job(PurgeJob.objects.get(pk=job_id))
+            except Exception:
+                logger.exception('Purge job %s failed', job_id)
+            finally:
+                self.queue.task_done()
+
+
+purger = Purger()
@@ -0,0 +1,283 @@
+import bisect
+import math
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from itertools import islice
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils.module_loading import import_string
+
+from .models import Comment, Review, Title
+
+TITLE_KIND = 'title'
+REVIEW_KIND = 'review'
+COMMENT_KIND = 'comment'
+KINDS = (TITLE_KIND, REVIEW_KIND, COMMENT_KIND)
+TITLE_WEIGHT = 10.0
+REBUILD_CHUNK_SIZE = 2000
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def documents(kinds=KINDS):
+    """(kind, object_id, title, body) для всех индексируемых объектов."""
+    sources = {
+        TITLE_KIND: Title.objects.values_list('pk', 'name', 'description'),
+        REVIEW_KIND: Review.objects.values_list('pk', 'text'),
+        COMMENT_KIND: Comment.objects.values_list('pk', 'text'),
+    }
+    for kind in kinds:
+        for row in sources[kind].order_by().iterator(REBUILD_CHUNK_SIZE):
+            if kind == TITLE_KIND:
+                yield kind, row[0], row[1], row[2] or ''
+            else:
+                yield kind, row[0], '', row[1]
+
+
+def document_for(instance):
+    if isinstance(instance, Title):
+        return (
+            TITLE_KIND, instance.pk, instance.name, instance.description or ''
+        )
+    if isinstance(instance, Review):
+        return REVIEW_KIND, instance.pk, '', instance.text
+    return COMMENT_KIND, instance.pk, '', instance.text
+
+
+class BaseSearchBackend:
+    """Полнотекстовый индекс по произведениям, отзывам и комментариям."""
+
+    @classmethod
+    def is_available(cls):
+        return True
+
+    def index(self, instance):
+        raise NotImplementedError
+
+    def remove(self, instance):
+        raise NotImplementedError
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def search(self, query, kinds=KINDS, limit=100):
+        """Список (kind, object_id, rank) по убыванию релевантности."""
+        raise NotImplementedError
+
+
+def get_rowid(kind, object_id):
+    """rowid документа в индексе: object_id и вид объекта в одном числе."""
+    return object_id * len(KINDS) + KINDS.index(kind)
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    Индекс в виртуальной таблице SQLite FTS5 рядом с данными.
+
+    Столбцы kind и object_id объявлены UNINDEXED, поэтому документ
+    адресуется rowid из get_rowid: удаление по нему не сканирует таблицу.
+    """
+    table = 'reviews_search_index'
+
+    def __init__(self):
+        self.ready = False
+
+    @classmethod
+    def is_available(cls):
+        if connection.vendor != 'sqlite':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA compile_options')
+            return ('ENABLE_FTS5',) in cursor.fetchall()
+
+    def ensure_table(self):
+        if self.ready:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5('
+                'kind UNINDEXED, object_id UNINDEXED, title, body)'
+            )
+        self.ready = True
+
+    def index(self, instance):
+        self.ensure_table()
+        kind, object_id, title, body = document_for(instance)
+        rowid = get_rowid(kind, object_id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [rowid]
+            )
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, kind, object_id, title, '
+                'body) VALUES (%s, %s, %s, %s, %s)',
+                [rowid, kind, object_id, title, body],
+            )
+
+    def remove(self, instance):
+        self.ensure_table()
+        kind, object_id, _, _ = document_for(instance)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [get_rowid(kind, object_id)],
+            )
+
+    def rebuild(self):
+        self.ensure_table()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            rows = documents()
+            while True:
+                chunk = list(islice(rows, REBUILD_CHUNK_SIZE))
+                if not chunk:
+                    break
+                cursor.executemany(
+                    f'INSERT INTO {self.table} (rowid, kind, object_id, '
+                    'title, body) VALUES (%s, %s, %s, %s, %s)',
+                    [(get_rowid(kind, object_id), kind, object_id, title,
+                      body) for kind, object_id, title, body in chunk],
+                )
+
+    def search(self, query, kinds=KINDS, limit=100):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        self.ensure_table()
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        placeholders = ', '.join(['%s'] * len(kinds))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT kind, object_id, '
+                f'-bm25({self.table}, 0, 0, %s, 1.0) AS rank '
+                f'FROM {self.table} WHERE {self.table} MATCH %s '
+                f'AND kind IN ({placeholders}) '
+                'ORDER BY rank DESC LIMIT %s',
+                [TITLE_WEIGHT, match, *kinds, limit],
+            )
+            return [
+                (kind, int(object_id), rank)
+                for kind, object_id, rank in cursor.fetchall()
+            ]
+
+
+class InMemoryBackend(BaseSearchBackend):
+    """
+    Инвертированный индекс в памяти процесса для СУБД без FTS.
+
+    Строится из БД при первом поиске и обновляется после коммита.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.built = False
+
+    def build(self):
+        with self.lock:
+            self.built = False
+            self.postings = defaultdict(dict)
+            self.documents = {}
+            self.vocabulary = []
+            for document in documents():
+                self.add(*document)
+            self.vocabulary = sorted(self.postings)
+            self.built = True
+
+    def add(self, kind, object_id, title, body):
+        key = (kind, object_id)
+        terms = defaultdict(float)
+        for token in tokenize(title):
+            terms[token] += TITLE_WEIGHT
+        for token in tokenize(body):
+            terms[token] += 1.0
+        self.documents[key] = list(terms)
+        for term, weight in terms.items():
+            if self.built and term not in self.postings:
+                bisect.insort(self.vocabulary, term)
+            self.postings[term][key] = weight
+
+    def discard(self, key):
+        for term in self.documents.pop(key, ()):
+            self.postings[term].pop(key, None)
+
+    def index(self, instance):
+        document = document_for(instance)
+        transaction.on_commit(lambda: self.apply(document, True))
+
+    def remove(self, instance):
+        document = document_for(instance)
+        transaction.on_commit(lambda: self.apply(document, False))
+
+    def apply(self, document, present):
+        with self.lock:
+            if not self.built:
+                return
+            self.discard(document[:2])
+            if present:
+                self.add(*document)
+
+    def rebuild(self):
+        self.build()
+
+    def expand(self, prefix):
+        position = bisect.bisect_left(self.vocabulary, prefix)
+        while (
+            position < len(self.vocabulary)
+            and self.vocabulary[position].startswith(prefix)
+        ):
+            yield self.vocabulary[position]
+            position += 1
+
+    def search(self, query, kinds=KINDS, limit=100):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self.lock:
+            if not self.built:
+                self.build()
+            total = max(len(self.documents), 1)
+            scores = None
+            for token in tokens:
+                token_scores = defaultdict(float)
+                for term in self.expand(token):
+                    postings = self.postings[term]
+                    if not postings:
+                        continue
+                    idf = math.log(1 + total / len(postings))
+                    for key, weight in postings.items():
+                        token_scores[key] += weight * idf
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {
+                        key: score + token_scores[key]
+                        for key, score in scores.items()
+                        if key in token_scores
+                    }
+        ranked = sorted(
+            (
+                (kind, object_id, score)
+                for (kind, object_id), score in scores.items()
+                if kind in kinds
+            ),
+            key=lambda item: item[2],
+            reverse=True,
+        )
+        return ranked[:limit]
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    backend_class = import_string(settings.SEARCH_BACKEND)
+    try:
+        available = backend_class.is_available()
+    except DatabaseError:
+        available = False
+    return backend_class() if available else InMemoryBackend()
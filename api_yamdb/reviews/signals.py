@@ -0,0 +1,49 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Comment, Review, Title
+from .search import get_backend
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    instance._rating_origin = None
+    if instance.pk:
+        instance._rating_origin = Review.objects.filter(
+            pk=instance.pk
+        ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def apply_review_score(sender, instance, created, **kwargs):
+    score = int(instance.score)
+    origin = getattr(instance, '_rating_origin', None)
+    if created or origin is None:
+        Title.shift_rating(instance.title_id, score, 1)
+        return
+    old_title_id, old_score = origin
+    if old_title_id == instance.title_id:
+        if score != old_score:
+            Title.shift_rating(instance.title_id, score - old_score, 0)
+        return
+    Title.shift_rating(old_title_id, -old_score, -1)
+    Title.shift_rating(instance.title_id, score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def revert_review_score(sender, instance, **kwargs):
+    Title.shift_rating(instance.title_id, -int(instance.score), -1)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def index_document(sender, instance, **kwargs):
+    get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def remove_document(sender, instance, **kwargs):
+    get_backend().remove(instance)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 @admin.register(User)
@@ -10,3 +10,15 @@ class UserAdmin(admin.ModelAdmin):
     list_editable = ('role',)
     search_fields = ('username',)
     empty_value_display = '-пусто-'
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'recipient', 'subject', 'status', 'attempts',
+        'next_attempt_at', 'sent_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('recipient',)
+    readonly_fields = ('claimed_by', 'claimed_at', 'last_error', 'sent_at')
+    empty_value_display = '-пусто-'
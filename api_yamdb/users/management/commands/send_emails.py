@@ -0,0 +1,63 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from users.outbox import drain
+
+
+class Command(BaseCommand):
+    help = 'Отправка писем из outbox пачками через пул обработчиков'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число параллельных обработчиков',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Писем в пачке (по умолчанию EMAIL_OUTBOX_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь один раз и завершиться',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Пауза между проходами по пустой очереди, секунд',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'], 1)
+        prefix = uuid.uuid4().hex[:8]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                results = list(executor.map(
+                    lambda number: self.work(
+                        f'{prefix}-{number}', options['batch_size']
+                    ),
+                    range(workers),
+                ))
+                sent = sum(result[0] for result in results)
+                failed = sum(result[1] for result in results)
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent}, failed {failed}')
+                if options['once']:
+                    return
+                if not sent and not failed:
+                    time.sleep(options['interval'])
+
+    def work(self, worker, batch_size):
+        """
+        Один проход обработчика. Ошибка не останавливает команду: взятые
+        письма вернутся в очередь по EMAIL_OUTBOX_CLAIM_TIMEOUT.
+        """
+        try:
+            return drain(batch_size=batch_size, worker=worker)
+        except Exception as error:
+            self.stderr.write(f'Worker {worker} failed: {error!r}')
+            return 0, 0
+        finally:
+            connection.close()
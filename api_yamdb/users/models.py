@@ -3,6 +3,7 @@ import re
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
 
 
@@ -63,6 +64,11 @@ class User(AbstractUser):
         null=True,
         blank=True
     )
+    is_hidden = models.BooleanField(
+        'Скрыт до удаления',
+        default=False,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -83,3 +89,51 @@ class User(AbstractUser):
             or self.is_superuser
             or self.is_staff
         )
+
+
+class OutgoingEmail(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+    subject = models.CharField('Тема', max_length=settings.NAME_MAX_LENGTH)
+    body = models.TextField('Текст')
+    from_email = models.EmailField(
+        'Отправитель', max_length=settings.EMAIL_MAX_LENGTH
+    )
+    recipient = models.EmailField(
+        'Получатель', max_length=settings.EMAIL_MAX_LENGTH
+    )
+    status = models.CharField(
+        'Статус', max_length=max([len(value) for value, name in STATUSES]),
+        choices=STATUSES, default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    claimed_by = models.CharField(
+        'Обработчик', max_length=64, blank=True, default=''
+    )
+    claimed_at = models.DateTimeField('Взято в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True, default='')
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('id',)
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'],
+                         name='outgoing_email_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject[:30]}'
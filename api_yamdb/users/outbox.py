@@ -0,0 +1,149 @@
+import uuid
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+STALE_ERROR = 'Обработчик не завершил отправку'
+
+
+def enqueue_email(subject, body, recipient, from_email=None):
+    """Кладёт письмо в outbox; отправит его фоновый обработчик."""
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        recipient=recipient,
+        from_email=from_email or settings.FROM_EMAIL,
+    )
+    if settings.EMAIL_OUTBOX_EAGER:
+        transaction.on_commit(lambda: send_emails(claim_emails(
+            OutgoingEmail.objects.filter(pk=email.pk)
+        )))
+    return email
+
+
+def claim_emails(queryset=None, batch_size=None, worker=None):
+    """
+    Атомарно забирает пачку писем, готовых к отправке.
+
+    Одним UPDATE помечает письма обработчиком, поэтому несколько
+    обработчиков не отправят одно письмо дважды. Письма, зависшие в
+    статусе «отправляется» дольше EMAIL_OUTBOX_CLAIM_TIMEOUT, забираются
+    повторно; зависание считается попыткой, поэтому письмо, на котором
+    обработчик падает каждый раз, в итоге помечается как неотправленное.
+    """
+    now = timezone.now()
+    worker = worker or uuid.uuid4().hex
+    if queryset is None:
+        queryset = OutgoingEmail.objects.all()
+    stale = Q(
+        status=OutgoingEmail.SENDING,
+        claimed_at__lt=now - settings.EMAIL_OUTBOX_CLAIM_TIMEOUT,
+    )
+    queryset.filter(
+        stale, attempts__gte=settings.EMAIL_OUTBOX_MAX_ATTEMPTS - 1
+    ).update(
+        status=OutgoingEmail.FAILED, attempts=F('attempts') + 1,
+        claimed_by='', last_error=STALE_ERROR,
+    )
+    ready = queryset.filter(
+        Q(status=OutgoingEmail.PENDING, next_attempt_at__lte=now) | stale
+    ).order_by('next_attempt_at', 'id').values('pk')
+    OutgoingEmail.objects.filter(
+        pk__in=ready[:batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE]
+    ).update(
+        status=OutgoingEmail.SENDING, claimed_by=worker, claimed_at=now,
+        attempts=Case(
+            When(status=OutgoingEmail.SENDING, then=F('attempts') + 1),
+            default=F('attempts'),
+        ),
+    )
+    return list(OutgoingEmail.objects.filter(
+        status=OutgoingEmail.SENDING, claimed_by=worker, claimed_at=now
+    ))
+
+
+def get_backoff(attempts):
+    return min(
+        settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_BACKOFF,
+    )
+
+
+def release(email, error):
+    """
+    Возвращает письмо в очередь с отсрочкой по get_backoff.
+
+    После EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо помечается как
+    неотправленное.
+    """
+    attempts = email.attempts + 1
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        status=(
+            OutgoingEmail.FAILED
+            if attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+            else OutgoingEmail.PENDING
+        ),
+        attempts=attempts,
+        next_attempt_at=timezone.now() + get_backoff(attempts),
+        claimed_by='',
+        last_error=repr(error),
+    )
+
+
+def send_emails(emails, connection=None):
+    """
+    Отправляет письма через одно соединение, возвращает (sent, failed).
+
+    Если соединение открыть не удалось, вся пачка возвращается в очередь
+    как неудачная попытка.
+    """
+    if not emails:
+        return 0, 0
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            release(email, error)
+        return 0, len(emails)
+    sent = failed = 0
+    try:
+        for email in emails:
+            try:
+                EmailMessage(
+                    email.subject, email.body, email.from_email,
+                    [email.recipient], connection=connection,
+                ).send()
+            except Exception as error:
+                failed += 1
+                release(email, error)
+            else:
+                sent += 1
+                # Текст с кодом подтверждения после отправки не хранится.
+                OutgoingEmail.objects.filter(pk=email.pk).update(
+                    status=OutgoingEmail.SENT,
+                    body='',
+                    attempts=email.attempts + 1,
+                    sent_at=timezone.now(),
+                    claimed_by='',
+                )
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def drain(batch_size=None, worker=None, connection=None):
+    """Отправляет пачки, пока в outbox есть готовые письма."""
+    total_sent = total_failed = 0
+    while True:
+        emails = claim_emails(batch_size=batch_size, worker=worker)
+        if not emails:
+            return total_sent, total_failed
+        sent, failed = send_emails(emails, connection)
+        total_sent += sent
+        total_failed += failed
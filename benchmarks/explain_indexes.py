@@ -0,0 +1,196 @@
+"""EXPLAIN QUERY PLAN горячих запросов API до и после индексов.
+
+Создаёт временную SQLite-базу, заполняет её сгенерированными данными
+(по умолчанию миллион отзывов), удаляет индексы из Meta.indexes моделей
+и выводит планы и время запросов, затем создаёт индексы и повторяет.
+
+    python benchmarks/explain_indexes.py --reviews 1000000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+
+def setup_django(db_path):
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = db_path
+    django.setup()
+
+
+def generate(reviews, users, comments):
+    from django.db import connection, transaction
+
+    titles = -(-reviews // users)
+    genres, categories = 20, 10
+    start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    random.seed(0)
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous = OFF')
+        cursor.execute('PRAGMA journal_mode = MEMORY')
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO users_user (id, username, email, role, password, '
+            'is_superuser, is_staff, is_active, is_hidden, date_joined) '
+            "VALUES (%s, %s, %s, 'user', '', 0, 0, 1, 0, %s)",
+            [(idx, f'user{idx}', f'user{idx}@yamdb.fake', start)
+             for idx in range(1, users + 1)],
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_category (id, name, slug) '
+            'VALUES (%s, %s, %s)',
+            [(idx, f'Категория {idx}', f'category-{idx}')
+             for idx in range(1, categories + 1)],
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_genre (id, name, slug) VALUES (%s, %s, %s)',
+            [(idx, f'Жанр {idx}', f'genre-{idx}')
+             for idx in range(1, genres + 1)],
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_title (id, name, year, category_id, '
+            'review_count, score_sum, is_hidden) '
+            'VALUES (%s, %s, %s, %s, 0, 0, 0)',
+            [(idx, f'Произведение {random.random():.8f}',
+              random.randint(1950, 2022), random.randint(1, categories))
+             for idx in range(1, titles + 1)],
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_genretitle (title_id, genre_id) '
+            'VALUES (%s, %s)',
+            [(title, genre) for title in range(1, titles + 1)
+             for genre in random.sample(range(1, genres + 1), 3)],
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_review (id, title_id, author_id, text, '
+            'score, pub_date) VALUES (%s, %s, %s, %s, %s, %s)',
+            ((idx + 1, idx // users + 1, idx % users + 1, 'Отзыв',
+              random.randint(1, 10),
+              start + timedelta(seconds=random.randint(0, 10 ** 8)))
+             for idx in range(reviews)),
+        )
+        cursor.executemany(
+            'INSERT INTO reviews_comment (review_id, author_id, text, '
+            'pub_date) VALUES (%s, %s, %s, %s)',
+            ((random.randint(1, 50), random.randint(1, users), 'Комментарий',
+              start + timedelta(seconds=random.randint(0, 10 ** 8)))
+             for _ in range(comments)),
+        )
+    from reviews.models import Title
+    Title.rebuild_ratings()
+
+
+def model_indexes():
+    from reviews.models import Comment, GenreTitle, Review, Title
+
+    return [
+        (model, index)
+        for model in (Title, GenreTitle, Review, Comment)
+        for index in model._meta.indexes
+    ]
+
+
+def hot_queries():
+    from reviews.models import Comment, GenreTitle, Review, Title
+
+    title = Title.objects.order_by('-review_count').first()
+    review = Review.objects.filter(title=title).order_by('pub_date').first()
+    middle = Review.objects.filter(title=title).order_by('pub_date')[
+        title.review_count // 2
+    ]
+    titles = Title.objects.select_related('category')
+    return {
+        'titles: list, ordering=name': titles.order_by('name')[:5],
+        'titles: ?category=': titles.filter(
+            category__slug='category-3').order_by('name')[:5],
+        'titles: ?genre=': titles.filter(
+            genre__slug='genre-7').order_by('name')[:5],
+        'titles: ?name= (icontains)': titles.filter(
+            name__icontains='0.5').order_by('name')[:5],
+        'titles: ordering=-rating': titles.order_by('-rating')[:5],
+        'titles: genre prefetch': GenreTitle.objects.filter(
+            title_id__in=list(range(1, 6))).select_related('genre'),
+        'reviews: page': Review.objects.filter(
+            title=title).order_by('pub_date')[:5],
+        'reviews: page 100 (OFFSET)': Review.objects.filter(
+            title=title).order_by('pub_date')[495:500],
+        'reviews: keyset page': Review.objects.filter(
+            title=title, pub_date__gt=middle.pub_date
+        ).order_by('pub_date', 'id')[:6],
+        'comments: page': Comment.objects.filter(
+            review=review).order_by('pub_date')[:5],
+    }
+
+
+def measure(queries, repeat):
+    results = {}
+    for name, queryset in queries.items():
+        plan = queryset.explain()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        results[name] = (plan, (time.perf_counter() - started) / repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--comments', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--db', help='Путь к базе (по умолчанию временный)')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(
+        tempfile.mkdtemp(prefix='yamdb-bench-'), 'bench.sqlite3'
+    )
+    setup_django(db_path)
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    started = time.perf_counter()
+    generate(args.reviews, args.users, args.comments)
+    print(f'Generated {args.reviews} reviews in '
+          f'{time.perf_counter() - started:.1f}s ({db_path})')
+
+    with connection.schema_editor() as editor:
+        for model, index in model_indexes():
+            editor.remove_index(model, index)
+    connection.cursor().execute('ANALYZE')
+    before = measure(hot_queries(), args.repeat)
+
+    with connection.schema_editor() as editor:
+        for model, index in model_indexes():
+            editor.add_index(model, index)
+    connection.cursor().execute('ANALYZE')
+    after = measure(hot_queries(), args.repeat)
+
+    for name in before:
+        (plan_before, time_before), (plan_after, time_after) = (
+            before[name], after[name]
+        )
+        print(f'\n=== {name}')
+        print(f'--- before: {time_before * 1000:.2f} ms')
+        print(plan_before)
+        print(f'--- after: {time_after * 1000:.2f} ms')
+        print(plan_after)
+
+    if not args.db:
+        connection.close()
+        shutil.rmtree(os.path.dirname(db_path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Пропускная способность эндпоинтов отзывов при параллельных чтении и записи.
+
+Создаёт временную SQLite-базу, заполняет её произведениями и отзывами и
+гоняет через тестовый клиент DRF потоки читателей (список отзывов) и
+писателей (новые отзывы) сначала со стандартными настройками SQLite
+(журнал delete, synchronous full, без mmap), затем с SQLITE_PRAGMAS из
+настроек проекта. Выводит число запросов в секунду и ошибки блокировки.
+
+    python benchmarks/sqlite_concurrency.py --readers 8 --writers 4
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+STOCK_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+    'cache_size': -2000,
+    'mmap_size': 0,
+}
+
+
+def setup_django(db_path):
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+
+
+def generate(titles, users, reviews):
+    from django.db import transaction
+
+    from reviews.models import Category, Review, Title
+    from users.models import User
+
+    with transaction.atomic():
+        category = Category.objects.create(name='Фильм', slug='movie')
+        User.objects.bulk_create(
+            User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+            for idx in range(users)
+        )
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000, category=category)
+            for idx in range(titles)
+        )
+        authors = list(User.objects.values_list('pk', flat=True))
+        title_ids = list(Title.objects.values_list('pk', flat=True))
+        Review.objects.bulk_create(
+            Review(title_id=title_ids[idx % titles],
+                   author_id=authors[idx // titles % users],
+                   text='Отзыв', score=5)
+            for idx in range(min(reviews, titles * (users // 2)))
+        )
+        Title.rebuild_ratings()
+    return title_ids
+
+
+def loop(step, kind, deadline, counts, lock, conn_max_age):
+    from django.db import connection
+
+    position = 0
+    while time.monotonic() < deadline:
+        try:
+            ok = step(position)
+        except Exception:
+            ok = False
+        with lock:
+            counts[kind if ok else f'{kind}_error'] += 1
+        position += 1
+        if not conn_max_age:
+            connection.close()
+    connection.close()
+
+
+def run(pragmas, title_ids, readers, writers, duration, conn_max_age,
+        offset):
+    from django.conf import settings
+    from django.db import connection, connections
+    from rest_framework.test import APIClient
+
+    from users.models import User
+
+    connections.close_all()
+    settings.SQLITE_PRAGMAS = pragmas
+    settings.DATABASES['default']['CONN_MAX_AGE'] = conn_max_age
+    counts = Counter()
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def reader(number):
+        client = APIClient()
+        return lambda position: client.get(
+            f'/api/v1/titles/'
+            f'{title_ids[(number + position * readers) % len(title_ids)]}'
+            '/reviews/'
+        ).status_code == 200
+
+    def writer(user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return lambda position: client.post(
+            f'/api/v1/titles/{title_ids[position % len(title_ids)]}'
+            '/reviews/',
+            data={'text': 'Нагрузочный отзыв', 'score': 7},
+        ).status_code in (201, 400)
+
+    steps = [(reader(number), 'read') for number in range(readers)] + [
+        (writer(user), 'write')
+        for user in User.objects.order_by('-pk')[offset:offset + writers]
+    ]
+    threads = [
+        threading.Thread(target=loop, args=(
+            step, kind, deadline, counts, lock, conn_max_age
+        ))
+        for step, kind in steps
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        journal_mode = cursor.fetchone()[0]
+    return journal_mode, elapsed, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--reviews', type=int, default=100_000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--conn-max-age', type=int, default=60)
+    parser.add_argument('--db', help='Путь к базе (по умолчанию временный)')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(
+        tempfile.mkdtemp(prefix='yamdb-bench-'), 'bench.sqlite3'
+    )
+    setup_django(db_path)
+    from django.conf import settings
+    from django.core.management import call_command
+
+    tuned = dict(settings.SQLITE_PRAGMAS)
+    settings.SQLITE_PRAGMAS = STOCK_PRAGMAS
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    title_ids = generate(args.titles, args.users, args.reviews)
+    print(f'{len(title_ids)} titles, {args.readers} readers, '
+          f'{args.writers} writers, {args.duration:.0f}s per run ({db_path})')
+
+    for offset, (label, pragmas, conn_max_age) in enumerate((
+        ('stock', STOCK_PRAGMAS, 0),
+        ('tuned', tuned, args.conn_max_age),
+    )):
+        journal_mode, elapsed, counts = run(
+            pragmas, title_ids, args.readers, args.writers, args.duration,
+            conn_max_age, offset * args.writers,
+        )
+        print(f'\n=== {label} (journal_mode={journal_mode}, '
+              f'CONN_MAX_AGE={conn_max_age})')
+        print(f'reads:  {counts["read"] / elapsed:8.1f} req/s, '
+              f'errors {counts["read_error"]}')
+        print(f'writes: {counts["write"] / elapsed:8.1f} req/s, '
+              f'errors {counts["write_error"]}')
+
+    if not args.db:
+        from django.db import connections
+
+        connections.close_all()
+        shutil.rmtree(os.path.dirname(db_path))
+
+
+if __name__ == '__main__':
+    main()
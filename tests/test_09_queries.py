@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+MAX_QUERIES = {
+    'titles': 3,
+    'reviews': 3,
+    'comments': 3,
+}
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return len(context.captured_queries)
+
+
+def assert_constant_queries(client, url, fill, resource):
+    fill(1)
+    single = count_queries(client, url)
+    fill(4)
+    page = count_queries(client, url)
+    assert single == page, (
+        f'Проверьте, что число запросов к БД при GET-запросе к `{url}` не '
+        f'зависит от размера страницы: {single} запрос(ов) для одного '
+        f'объекта и {page} для страницы.'
+    )
+    assert page <= MAX_QUERIES[resource], (
+        f'Проверьте, что GET-запрос к `{url}` выполняет не больше '
+        f'{MAX_QUERIES[resource]} запросов к БД, сейчас: {page}.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    @pytest.fixture
+    def catalogue(self):
+        from api.catalogue import catalogue
+        from reviews.models import Category, Genre
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(3)
+        ]
+        catalogue.warm()
+        return category, genres
+
+    @pytest.fixture
+    def authors(self, django_user_model):
+        return [
+            django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(5)
+        ]
+
+    def test_01_titles_list(self, client, catalogue):
+        from reviews.models import Title
+
+        category, genres = catalogue
+
+        def fill(count):
+            for idx in range(count):
+                title = Title.objects.create(
+                    name=f'Произведение {idx}', year=2000, category=category
+                )
+                title.genre.set(genres)
+
+        assert_constant_queries(client, '/api/v1/titles/', fill, 'titles')
+
+    def test_02_reviews_list(self, client, catalogue, authors):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(
+            name='Произведение', year=2000, category=catalogue[0]
+        )
+        queue = iter(authors)
+
+        def fill(count):
+            for _ in range(count):
+                Review.objects.create(
+                    title=title, author=next(queue), text='Отзыв', score=5
+                )
+
+        assert_constant_queries(
+            client, f'/api/v1/titles/{title.id}/reviews/', fill, 'reviews'
+        )
+
+    def test_03_comments_list(self, client, catalogue, authors):
+        from reviews.models import Comment, Review, Title
+
+        title = Title.objects.create(
+            name='Произведение', year=2000, category=catalogue[0]
+        )
+        review = Review.objects.create(
+            title=title, author=authors[0], text='Отзыв', score=5
+        )
+        queue = iter(authors)
+
+        def fill(count):
+            for _ in range(count):
+                Comment.objects.create(
+                    review=review, author=next(queue), text='Комментарий'
+                )
+
+        assert_constant_queries(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            fill, 'comments'
+        )
@@ -0,0 +1,99 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def client_for(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TokenClaims:
+
+    def test_01_token_carries_role(self, client, moderator):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': moderator.username,
+            'confirmation_code': default_token_generator.make_token(
+                moderator
+            ),
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert (
+            token['role'], token['is_staff'], token['is_superuser']
+        ) == ('moderator', False, False), (
+            'Проверьте, что токен содержит claims `role`, `is_staff` и '
+            '`is_superuser`.'
+        )
+
+    def test_02_permissions_without_user_lookup(self, admin):
+        from api.authentication import get_access_token
+
+        admin_client = client_for(get_access_token(admin))
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK
+        user_lookups = [
+            query for query in context.captured_queries
+            if 'WHERE "users_user"."id"' in query['sql']
+        ]
+        assert not user_lookups, (
+            'Проверьте, что пользователь с claims роли в токене '
+            'аутентифицируется без запроса к таблице пользователей.'
+        )
+
+    def test_03_role_change_revokes_claims(self, admin_client, moderator):
+        from api.authentication import get_access_token
+
+        moderator_client = client_for(get_access_token(moderator))
+        response = admin_client.patch(
+            f'/api/v1/users/{moderator.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = moderator_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена роли через `/api/v1/users/{username}/` '
+            'сразу применяется к уже выданным токенам.'
+        )
+
+        admin_client.delete(f'/api/v1/users/{moderator.username}/')
+        response = moderator_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя перестаёт '
+            'действовать.'
+        )
+
+    def test_04_orm_changes_revoke_claims(self, admin, user):
+        from api.authentication import get_access_token
+
+        admin_token_client = client_for(get_access_token(admin))
+        user_token_client = client_for(get_access_token(user))
+        admin.role = 'user'
+        admin.save()
+        response = admin_token_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что смена роли через админку или shell сразу '
+            'применяется к уже выданным токенам.'
+        )
+        user.is_active = False
+        user.save()
+        response = user_token_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен деактивированного пользователя сразу '
+            'перестаёт действовать.'
+        )
+
+    def test_05_token_without_role_claims(self, admin):
+        response = client_for(AccessToken.for_user(admin)).get(
+            '/api/v1/users/'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что токен без claims роли проверяется по БД.'
+        )
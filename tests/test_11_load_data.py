@@ -0,0 +1,128 @@
+import csv
+import pathlib
+
+import pytest
+from django.core.management import call_command
+
+DATASET = {
+    'users.csv': (
+        ('id', 'username', 'email', 'role', 'bio', 'first_name',
+         'last_name'),
+        [(100 + idx, f'reader{idx}', f'reader{idx}@yamdb.fake', 'user', '',
+          '', '') for idx in range(4)],
+    ),
+    'category.csv': (
+        ('id', 'name', 'slug'),
+        [(1, 'Фильм', 'movie'), (2, 'Книга', 'book')],
+    ),
+    'genre.csv': (
+        ('id', 'name', 'slug'),
+        [(1, 'Драма', 'drama'), (2, 'Комедия', 'comedy')],
+    ),
+    'titles.csv': (
+        ('id', 'name', 'year', 'category'),
+        [(idx, f'Произведение {idx}', 2000 + idx, idx % 2 + 1)
+         for idx in range(1, 6)],
+    ),
+    'genre_title.csv': (
+        ('id', 'title_id', 'genre_id'),
+        [(idx, idx, idx % 2 + 1) for idx in range(1, 6)],
+    ),
+    'review.csv': (
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        [(idx * 10 + author, idx, 'Текст, "с кавычками"\nи переносом',
+          100 + author, author + 5, '2019-09-24T21:08:21.567Z')
+         for idx in range(1, 6) for author in range(4)],
+    ),
+    'comments.csv': (
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        [(idx, 10, f'Комментарий {idx}', 100 + idx % 4,
+          '2020-01-13T23:20:02.422Z') for idx in range(1, 4)],
+    ),
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for filename, (header, rows) in DATASET.items():
+        with open(tmp_path / filename, 'w', encoding='utf-8',
+                  newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header)
+            writer.writerows(rows)
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11LoadData:
+
+    def test_01_load_data(self, data_dir):
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title)
+        from users.models import User
+
+        call_command('load_data', path=str(data_dir), chunk_size=7)
+        expected = (
+            (User, 'users.csv'),
+            (Category, 'category.csv'),
+            (Genre, 'genre.csv'),
+            (Title, 'titles.csv'),
+            (GenreTitle, 'genre_title.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        )
+        for model, filename in expected:
+            assert model.objects.count() == len(DATASET[filename][1]), (
+                f'Проверьте, что команда `load_data` загружает все строки '
+                f'файла `{filename}`.'
+            )
+
+        review = Review.objects.get(pk=10)
+        assert review.pub_date.isoformat().startswith('2019-09-24T21:08:21'), (
+            'Проверьте, что `load_data` сохраняет `pub_date` отзывов из CSV.'
+        )
+        assert review.text == 'Текст, "с кавычками"\nи переносом'
+        title = Title.objects.get(pk=1)
+        assert (title.review_count, title.rating) == (4, 6.5), (
+            'Проверьте, что после загрузки отзывов пересчитывается рейтинг.'
+        )
+
+    def test_02_load_data_parallel(self, data_dir):
+        from reviews.models import Comment, Review
+
+        call_command('load_data', path=str(data_dir), workers=3)
+        assert Review.objects.count() == len(DATASET['review.csv'][1])
+        assert Comment.objects.count() == len(DATASET['comments.csv'][1]), (
+            'Проверьте, что `load_data --workers` загружает все таблицы.'
+        )
+
+    def test_03_load_data_resume(self, data_dir):
+        from django.core.management.base import CommandError
+
+        from reviews.management.commands.load_data import get_checkpoint_path
+        from reviews.models import Comment, Review
+
+        checkpoint = pathlib.Path(get_checkpoint_path(str(data_dir)))
+        comments_path = data_dir / 'comments.csv'
+        valid = comments_path.read_text(encoding='utf-8')
+        comments_path.write_text(
+            valid.replace('3,10,', '3,99,'), encoding='utf-8'
+        )
+        with pytest.raises(CommandError):
+            call_command('load_data', path=str(data_dir), chunk_size=2)
+        assert Comment.objects.count() == 2
+        assert checkpoint.exists(), (
+            'Проверьте, что `load_data` сохраняет прогресс загрузки.'
+        )
+        assert sorted(path.name for path in data_dir.iterdir()) == sorted(
+            DATASET
+        ), 'Проверьте, что прогресс загрузки не пишется в каталог данных.'
+
+        comments_path.write_text(valid, encoding='utf-8')
+        call_command('load_data', path=str(data_dir), chunk_size=2)
+        assert Review.objects.count() == len(DATASET['review.csv'][1])
+        assert Comment.objects.count() == len(DATASET['comments.csv'][1]), (
+            'Проверьте, что `load_data` продолжает загрузку с места '
+            'остановки.'
+        )
+        assert not checkpoint.exists()
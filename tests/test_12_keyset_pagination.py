@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12KeysetPagination:
+
+    @pytest.fixture
+    def reviews(self, django_user_model):
+        from django.utils import timezone
+
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        for idx in range(12):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'Отзыв {idx}', score=5
+            )
+        Review.objects.filter(id__lte=4).update(pub_date=timezone.now())
+        expected = list(
+            Review.objects.order_by('pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+        return f'/api/v1/titles/{title.id}/reviews/', expected
+
+    def test_01_walk_forward_and_back(self, client, reviews):
+        url, expected = reviews
+        response = client.get(url, {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что при `pagination=cursor` ответ не содержит '
+            '`count`.'
+        )
+        assert data['previous'] is None
+        pages = [data]
+        while data['next']:
+            data = client.get(data['next']).json()
+            pages.append(data)
+        received = [
+            review['id'] for page in pages for review in page['results']
+        ]
+        assert received == expected, (
+            'Проверьте, что переход по ссылкам `next` возвращает все отзывы '
+            'по порядку (`pub_date`, `id`) без пропусков и повторов.'
+        )
+
+        previous = client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую страницу.'
+        )
+
+    def test_02_invalid_cursor(self, client, reviews):
+        url, _ = reviews
+        response = client.get(url, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_page_number_by_default(self, client, reviews):
+        url, expected = reviews
+        data = client.get(url).json()
+        assert data['count'] == len(expected)
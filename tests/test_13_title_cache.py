@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleCache:
+
+    def test_01_cached_list_and_revalidation(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        response = client.get(url, {'ordering': 'year'})
+        etag = response['ETag']
+        assert etag and response['Last-Modified'], (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            cached = client.get(url, {'ordering': 'year'})
+        assert cached.json() == response.json()
+        assert not context.captured_queries, (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из '
+            'кэша без запросов к БД.'
+        )
+
+        response = client.get(
+            url, {'ordering': 'year'}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert client.get(url)['ETag'] != etag, (
+            'Проверьте, что ключ кэша учитывает параметры запроса.'
+        )
+
+    def test_02_invalidation(self, client, admin_client, user_client):
+        titles, categories, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/'
+        etag = client.get(url)['ETag']
+        other_etag = client.get(other_url)['ETag']
+        list_etag = client.get('/api/v1/titles/')['ETag']
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что кэш произведения сбрасывается при новом отзыве.'
+        )
+        assert client.get(
+            other_url, HTTP_IF_NONE_MATCH=other_etag
+        ).status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв сбрасывает кэш только своего произведения.'
+        )
+        assert client.get('/api/v1/titles/')['ETag'] != list_etag
+
+        admin_client.patch(url, data={'genre': [genres[2]['slug']]})
+        assert [
+            genre['slug'] for genre in client.get(url).json()['genre']
+        ] == [genres[2]['slug']], (
+            'Проверьте, что кэш произведения сбрасывается при смене жанров.'
+        )
+
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        assert client.get(url).json()['category'] is None, (
+            'Проверьте, что кэш произведений сбрасывается при удалении '
+            'категории.'
+        )
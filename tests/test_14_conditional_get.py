@@ -0,0 +1,144 @@
+import json
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ConditionalGet:
+
+    def assert_not_modified(self, client, url, etag, message):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, message
+        assert not context.captured_queries, (
+            f'Проверьте, что ответ 304 на GET-запрос к `{url}` отдаётся без '
+            'запросов к БД.'
+        )
+
+    def test_01_feeds(self, client, admin_client, admin, user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review_url = f'{reviews_url}{reviews[1]["id"]}/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        urls = (
+            reviews_url, review_url, comments_url,
+            f'{comments_url}{comments[0]["id"]}/',
+            '/api/v1/categories/', '/api/v1/genres/',
+        )
+        etags = {url: client.get(url)['ETag'] for url in urls}
+        for url, etag in etags.items():
+            assert etag, (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок `ETag`.'
+            )
+            self.assert_not_modified(
+                client, url, etag,
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+
+        user_client.patch(review_url, data={'text': 'Исправленный отзыв'})
+        for url in (reviews_url, review_url):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что редактирование отзыва меняет `ETag` '
+                f'ответа на GET-запрос к `{url}`.'
+            )
+        self.assert_not_modified(
+            client, comments_url, etags[comments_url],
+            'Проверьте, что редактирование отзыва не меняет `ETag` '
+            'комментариев к другому отзыву.'
+        )
+
+        user_client.patch('/api/v1/users/me/', data={'username': 'renamed'})
+        response = client.get(
+            comments_url, HTTP_IF_NONE_MATCH=etags[comments_url]
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена username автора меняет `ETag` ленты.'
+        )
+
+    def test_02_me_is_per_user(self, admin_client, user_client):
+        url = '/api/v1/users/me/'
+        admin_etag = admin_client.get(url)['ETag']
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=admin_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `ETag` ответа на GET-запрос к `{url}` '
+            'различается для разных пользователей.'
+        )
+        user_etag = response['ETag']
+        user_client.patch(url, data={'bio': 'new bio'})
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=user_etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['bio'] == 'new bio'
+
+    def test_03_versions_are_shared_between_processes(self, client,
+                                                      admin_client):
+        from tests.utils import create_titles
+
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        etag = client.get(url)['ETag']
+        script = (
+            'import django; django.setup(); '
+            'from api.cache import TITLE_LIST, touch; touch(TITLE_LIST)'
+        )
+        subprocess.run(
+            [sys.executable, '-c', script], check=True,
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings'},
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что версии ответов хранятся в кэше, общем для всех '
+            'процессов сервера: изменение в другом процессе должно '
+            'сбрасывать ETag.'
+        )
+
+    def test_04_versions_use_normalized_ids(self, client, admin_client):
+        from tests.utils import create_titles
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/0{title_id}/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        response = admin_client.patch(
+            f'/api/v1/titles/{title_id}/', data=json.dumps({'name': 'Новое имя'}),
+            content_type='application/json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что версии ответа строятся по id произведения, а не '
+            'по строке из URL.'
+        )
+        assert response.json()['name'] == 'Новое имя'
+        assert client.get('/api/v1/titles/abc/').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+
+    def test_05_if_modified_since_alone_is_ignored(self, client,
+                                                   admin_client):
+        from tests.utils import create_titles
+
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что 304 отдаётся только по ETag: Last-Modified '
+            'точен лишь до секунды.'
+        )
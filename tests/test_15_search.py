@@ -0,0 +1,132 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.fixture(params=[
+    'reviews.search.SQLiteFTSBackend', 'reviews.search.InMemoryBackend'
+])
+def search_backend(request, settings):
+    from reviews.search import get_backend
+
+    settings.SEARCH_BACKEND = request.param
+    get_backend.cache_clear()
+    get_backend().rebuild()
+    yield get_backend()
+    get_backend.cache_clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Search:
+
+    def test_01_title_search(self, client, admin_client, search_backend):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            data={'description': 'Терминатор упоминается в описании'}
+        )
+        response = client.get('/api/v1/titles/', {'search': 'термина'})
+        assert response.status_code == HTTPStatus.OK
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [titles[0]['id'], titles[1]['id']], (
+            'Проверьте, что `?search=` в `/api/v1/titles/` находит '
+            'произведения по префиксу слова и ставит совпадение в названии '
+            'выше совпадения в описании.'
+        )
+        response = client.get(
+            '/api/v1/titles/', {'search': 'термина', 'ordering': 'name'}
+        )
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [titles[1]['id'], titles[0]['id']], (
+            'Проверьте, что явный `?ordering=` важнее релевантности.'
+        )
+
+    def test_02_search_endpoint(self, client, admin_client, user_client,
+                                search_backend):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[1]['id'], 'Лучший боевик про орешек', 9
+        ).json()
+        url = '/api/v1/search/'
+        response = client.get(url, {'q': 'орешек'})
+        assert response.status_code == HTTPStatus.OK
+        found = [
+            (item['type'], item['object']['id'])
+            for item in response.json()['results']
+        ]
+        assert found == [
+            ('title', titles[1]['id']), ('review', review['id'])
+        ], (
+            f'Проверьте, что `{url}` возвращает найденные произведения и '
+            'отзывы по убыванию релевантности.'
+        )
+
+        response = client.get(url, {'q': 'орешек', 'type': 'review'})
+        assert [
+            item['type'] for item in response.json()['results']
+        ] == ['review']
+
+        user_client.delete(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{review["id"]}/'
+        )
+        response = client.get(url, {'q': 'боевик'})
+        assert response.json()['count'] == 0, (
+            'Проверьте, что удалённые отзывы пропадают из поиска.'
+        )
+        assert client.get(url).status_code == HTTPStatus.BAD_REQUEST
+        assert client.get(
+            url, {'q': 'x', 'type': 'user'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_fts_rows_keyed_by_rowid(self, admin_client, settings):
+        from django.db import connection
+
+        from reviews.search import SQLiteFTSBackend, get_backend, get_rowid
+
+        settings.SEARCH_BACKEND = 'reviews.search.SQLiteFTSBackend'
+        get_backend.cache_clear()
+        backend = get_backend()
+        backend.ensure_table()
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        for name in ('Первое имя', 'Второе имя'):
+            admin_client.patch(
+                f'/api/v1/titles/{title_id}/', data={'name': name}
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, title FROM {SQLiteFTSBackend.table} '
+                'WHERE object_id = %s AND kind = %s', [title_id, 'title']
+            )
+            assert cursor.fetchall() == [
+                (get_rowid('title', title_id), 'Второе имя')
+            ], (
+                'Проверьте, что документ индекса адресуется rowid и не '
+                'дублируется при изменении объекта.'
+            )
+        get_backend.cache_clear()
+
+    def test_04_admin_search_reports_limit(self, admin_client,
+                                           search_backend, monkeypatch):
+        from django.test import Client
+
+        from reviews.admin import TitleAdmin
+        from users.models import User
+
+        create_titles(admin_client)
+        monkeypatch.setattr(TitleAdmin, 'search_limit', 1)
+        client = Client()
+        client.force_login(User.objects.create_superuser(
+            'search_admin', 'search_admin@yamdb.fake', 'password'
+        ))
+        response = client.get('/admin/reviews/title/', {'q': 'Терминатор'})
+        assert response.status_code == HTTPStatus.OK
+        assert any(
+            'Показаны первые 1' in str(message)
+            for message in response.context['messages']
+        ), (
+            'Проверьте, что админка сообщает об обрезанных результатах '
+            'поиска.'
+        )
@@ -0,0 +1,189 @@
+from datetime import timedelta
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16EmailOutbox:
+
+    @pytest.fixture(autouse=True)
+    def deferred_outbox(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+
+    def test_01_signup_only_enqueues(self, client):
+        from users.models import OutgoingEmail
+
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'outbox_user', 'email': 'outbox@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert not mail.outbox, (
+            'Проверьте, что `signup` не отправляет письмо во время запроса.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert (email.recipient, email.status) == (
+            'outbox@yamdb.fake', OutgoingEmail.PENDING
+        ), 'Проверьте, что `signup` кладёт письмо в outbox.'
+
+    def test_02_command_drains_outbox(self):
+        from users.models import OutgoingEmail
+        from users.outbox import enqueue_email
+
+        for number in range(5):
+            enqueue_email('Тема', 'Текст', f'user{number}@yamdb.fake')
+        call_command('send_emails', once=True, batch_size=2)
+        assert len(mail.outbox) == 5, (
+            'Проверьте, что команда `send_emails` отправляет все письма.'
+        )
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT
+        ).exists()
+        assert not OutgoingEmail.objects.exclude(body='').exists(), (
+            'Проверьте, что текст письма с кодом подтверждения не хранится '
+            'после отправки.'
+        )
+        call_command('send_emails', once=True)
+        assert len(mail.outbox) == 5, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_03_failed_send_is_retried_with_backoff(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import drain, enqueue_email
+
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        email = enqueue_email('Тема', 'Текст', 'retry@yamdb.fake')
+        with mock.patch(
+            'django.core.mail.EmailMessage.send',
+            side_effect=ConnectionError('SMTP недоступен'),
+        ):
+            assert drain() == (0, 1)
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.attempts == 1
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается.'
+        )
+        assert drain() == (0, 0)
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        with mock.patch(
+            'django.core.mail.EmailMessage.send',
+            side_effect=ConnectionError('SMTP недоступен'),
+        ):
+            drain()
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutgoingEmail.FAILED, 2), (
+            'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо '
+            'помечается как неотправленное.'
+        )
+
+    def test_04_stale_claim_is_reclaimed(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import claim_emails, drain, enqueue_email
+
+        enqueue_email('Тема', 'Текст', 'stale@yamdb.fake')
+        assert len(claim_emails(worker='crashed')) == 1
+        assert drain() == (0, 0), (
+            'Проверьте, что письмо, взятое другим обработчиком, не '
+            'отправляется повторно.'
+        )
+        OutgoingEmail.objects.update(
+            claimed_at=timezone.now() - settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+            - timedelta(seconds=1)
+        )
+        assert drain() == (1, 0)
+        assert len(mail.outbox) == 1
+        assert OutgoingEmail.objects.get().attempts == 2, (
+            'Проверьте, что повторный захват зависшего письма считается '
+            'попыткой.'
+        )
+
+    def test_05_connection_failure_releases_claims(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import drain, enqueue_email
+
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        enqueue_email('Тема', 'Текст', 'first@yamdb.fake')
+        enqueue_email('Тема', 'Текст', 'second@yamdb.fake')
+        OutgoingEmail.objects.filter(
+            recipient='second@yamdb.fake'
+        ).update(attempts=1)
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.open',
+            side_effect=ConnectionRefusedError('SMTP недоступен'),
+        ):
+            assert drain() == (0, 2), (
+                'Проверьте, что ошибка подключения к SMTP считается '
+                'неудачной попыткой для всей пачки.'
+            )
+        first = OutgoingEmail.objects.get(recipient='first@yamdb.fake')
+        assert (first.status, first.attempts, first.claimed_by) == (
+            OutgoingEmail.PENDING, 1, ''
+        ), 'Проверьте, что письма возвращаются в очередь.'
+        assert first.next_attempt_at > timezone.now()
+        assert 'SMTP недоступен' in first.last_error
+        second = OutgoingEmail.objects.get(recipient='second@yamdb.fake')
+        assert (second.status, second.attempts) == (OutgoingEmail.FAILED, 2)
+
+    def test_06_command_survives_failed_pass(self):
+        class Stop(Exception):
+            pass
+
+        with mock.patch(
+            'users.management.commands.send_emails.drain',
+            side_effect=[RuntimeError('database is locked'), (0, 0)],
+        ) as drain, mock.patch(
+            'users.management.commands.send_emails.time.sleep',
+            side_effect=[None, Stop],
+        ):
+            with pytest.raises(Stop):
+                call_command('send_emails', interval=0)
+        assert drain.call_count == 2, (
+            'Проверьте, что команда `send_emails` продолжает работу после '
+            'ошибки обработчика.'
+        )
+
+    def test_07_claims_are_exclusive(self):
+        from users.models import OutgoingEmail
+        from users.outbox import claim_emails, enqueue_email
+
+        for number in range(5):
+            enqueue_email('Тема', 'Текст', f'user{number}@yamdb.fake')
+        first = claim_emails(batch_size=2, worker='first')
+        second = claim_emails(batch_size=2, worker='second')
+        third = claim_emails(batch_size=2, worker='third')
+        assert [len(first), len(second), len(third)] == [2, 2, 1]
+        claimed = [email.pk for email in first + second + third]
+        assert sorted(claimed) == sorted(
+            OutgoingEmail.objects.values_list('pk', flat=True)
+        ), (
+            'Проверьте, что обработчики забирают разные письма и каждое '
+            'письмо достаётся одному обработчику.'
+        )
+        assert claim_emails(worker='fourth') == []
+
+    def test_08_repeatedly_stale_email_fails(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import claim_emails, enqueue_email
+
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        enqueue_email('Тема', 'Текст', 'crash@yamdb.fake')
+        assert len(claim_emails(worker='crashed')) == 1
+        for _ in range(settings.EMAIL_OUTBOX_MAX_ATTEMPTS):
+            OutgoingEmail.objects.update(
+                claimed_at=timezone.now() - settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+                - timedelta(seconds=1)
+            )
+            claim_emails(worker='crashed')
+        email = OutgoingEmail.objects.get()
+        assert (email.status, email.attempts) == (OutgoingEmail.FAILED, 2), (
+            'Проверьте, что письмо, на котором обработчик каждый раз '
+            'падает, после EMAIL_OUTBOX_MAX_ATTEMPTS попыток помечается как '
+            'неотправленное.'
+        )
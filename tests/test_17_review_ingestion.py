@@ -0,0 +1,114 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ReviewIngestion:
+
+    @pytest.fixture(autouse=True)
+    def queued_ingestion(self, settings):
+        settings.REVIEW_INGESTION_MODE = 'queued'
+
+    def test_01_review_is_accepted_and_written(self, admin_client,
+                                               user_client, moderator_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 4})
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            'Проверьте, что в режиме отложенной записи POST-запрос на '
+            f'`{url}` возвращает статус 202.'
+        )
+        status_url = response.json()['status_url']
+        assert response['Location'] == status_url
+        moderator_client.post(url, data={'text': 'Отзыв', 'score': 8})
+        assert user_client.get(status_url).json()['status'] == 'pending'
+        call_command('ingest_reviews', once=True)
+
+        submission = user_client.get(status_url).json()
+        assert submission['status'] == 'created', (
+            'Проверьте, что после записи пачки заявка получает статус '
+            '`created`.'
+        )
+        assert {'id', 'batch_size', 'commit_ms'} <= set(submission), (
+            'Проверьте, что статус заявки содержит id отзыва, размер пачки '
+            'и время коммита.'
+        )
+        response = user_client.get(f'{url}{submission["id"]}/')
+        assert response.status_code == HTTPStatus.OK
+        assert Title.objects.get(pk=title_id).rating == 6, (
+            'Проверьте, что рейтинг пересчитывается для отзывов, записанных '
+            'пачкой.'
+        )
+
+    def test_02_unique_review_is_enforced(self, admin_client, user):
+        from reviews.ingestion import drain, get_submission, submit
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        first = submit(titles[0]['id'], user.id, 'Первый', 5)
+        second = submit(titles[0]['id'], user.id, 'Второй', 7)
+        assert drain() == 2
+
+        assert get_submission(first)['status'] == 'created'
+        assert get_submission(second)['status'] == 'rejected', (
+            'Проверьте, что повторный отзыв автора на то же произведение '
+            'отклоняется при записи пачки.'
+        )
+        assert Review.objects.filter(author=user).count() == 1
+
+    def test_03_invalid_review_is_rejected_synchronously(self, admin_client,
+                                                          user_client):
+        titles, _, _ = create_titles(admin_client)
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 11},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_unknown_submission(self, user_client):
+        response = user_client.get(
+            f'/api/v1/titles/1/reviews/submissions/{"0" * 32}/'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_failed_batch_stays_queued(self, admin_client, user):
+        from reviews.ingestion import drain, get_submission, submit
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        token = submit(titles[0]['id'], user.id, 'Отзыв', 5)
+        with mock.patch.object(
+            Review, 'save', side_effect=RuntimeError('database is locked')
+        ):
+            with pytest.raises(RuntimeError):
+                drain()
+        assert get_submission(token)['status'] == 'pending', (
+            'Проверьте, что принятая заявка остаётся в очереди, если '
+            'записать пачку не удалось.'
+        )
+        call_command('ingest_reviews', once=True)
+        assert get_submission(token)['status'] == 'created'
+
+    def test_06_ingestion_stats(self, admin_client, user_client, user):
+        from reviews.ingestion import drain, submit
+
+        titles, _, _ = create_titles(admin_client)
+        submit(titles[0]['id'], user.id, 'Отзыв', 5)
+        drain()
+        submit(titles[1]['id'], user.id, 'Отзыв', 5)
+        url = '/api/v1/reviews/ingestion/stats/'
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        stats = response.json()
+        assert (stats['batches'], stats['reviews'], stats['pending']) == (
+            1, 1, 1
+        ), f'Проверьте, что `{url}` отдаёт статистику пачек писателя.'
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
@@ -0,0 +1,39 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18SQLitePragmas:
+
+    def test_01_pragmas_applied_on_connect(self, settings):
+        from api_yamdb.db import configure_sqlite
+
+        settings.SQLITE_PRAGMAS = {
+            'busy_timeout': 1234,
+            'synchronous': 'normal',
+            'cache_size': -4096,
+        }
+        configure_sqlite(None, connection)
+        assert (
+            pragma('busy_timeout'), pragma('synchronous'),
+            pragma('cache_size'),
+        ) == (1234, 1, -4096), (
+            'Проверьте, что SQLITE_PRAGMAS применяются к соединению.'
+        )
+
+    def test_02_invalid_pragmas_rejected(self, settings):
+        from api_yamdb.db import configure_sqlite
+
+        settings.SQLITE_PRAGMAS = {'synchronous': 'off; DROP TABLE x'}
+        with pytest.raises(ImproperlyConfigured):
+            configure_sqlite(None, connection)
+        settings.SQLITE_PRAGMAS = {'unknown_pragma': 1}
+        with pytest.raises(ImproperlyConfigured):
+            configure_sqlite(None, connection)
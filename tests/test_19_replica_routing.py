@@ -0,0 +1,99 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ReplicaRouting:
+
+    def test_01_router(self, settings):
+        from api_yamdb.db import (PrimaryReplicaRouter, reset_reads,
+                                  route_reads)
+        from reviews.models import Review
+
+        settings.DATABASE_REPLICAS = ['replica']
+        router = PrimaryReplicaRouter()
+        assert router.db_for_read(Review) is None, (
+            'Проверьте, что без явного указания чтение идёт в основную базу.'
+        )
+        token = route_reads('replica')
+        try:
+            assert router.db_for_read(Review) == 'replica'
+            assert router.db_for_write(Review) == 'default', (
+                'Проверьте, что запись всегда идёт в основную базу.'
+            )
+        finally:
+            reset_reads(token)
+        assert router.allow_migrate('replica', 'reviews') is False
+
+    def test_02_safe_requests_read_from_replica(self, settings, user):
+        from api.views import ReviewViewSet
+
+        settings.DATABASE_REPLICAS = ['replica']
+        view = ReviewViewSet()
+        anonymous = SimpleNamespace(method='GET', user=AnonymousUser())
+        assert view.get_read_database(anonymous) == 'replica', (
+            'Проверьте, что безопасные запросы читают из реплики.'
+        )
+        post = SimpleNamespace(method='POST', user=user)
+        assert view.get_read_database(post) == 'default'
+        settings.DATABASE_REPLICAS = []
+        assert view.get_read_database(anonymous) == 'default'
+
+    def test_03_read_your_writes(self, settings, admin_client, user,
+                                 user_client):
+        from api.mixins import STICKY_KEY
+        from api.views import ReviewViewSet
+
+        titles, _, _ = create_titles(admin_client)
+        settings.DATABASE_REPLICAS = ['replica']
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert cache.get(STICKY_KEY.format(user.id)), (
+            'Проверьте, что после записи пользователь закрепляется за '
+            'основной базой.'
+        )
+        view = ReviewViewSet()
+        assert view.get_read_database(
+            SimpleNamespace(method='GET', user=user)
+        ) == 'default'
+        response = user_client.get(f'{url}{response.json()["id"]}/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор сразу видит свой отзыв.'
+        )
+
+    def test_04_replica_reads_are_not_cached(self, settings, admin_client,
+                                             client, monkeypatch):
+        from api import mixins
+        from api.cards import CARD_KEY
+
+        titles, _, _ = create_titles(admin_client)
+        settings.DATABASE_REPLICAS = ['replica']
+        # Отдельной базы-реплики в тестах нет: чтение помечается как
+        # реплицированное, но фактически идёт в основную базу.
+        monkeypatch.setattr(mixins, 'route_reads', lambda alias: None)
+        cache.clear()
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert 'ETag' not in response and 'Last-Modified' not in response, (
+            'Проверьте, что ответы из реплики не получают ETag и '
+            'Last-Modified.'
+        )
+        assert cache.get(CARD_KEY.format(titles[0]['id'])) is None, (
+            'Проверьте, что карточки, собранные из реплики, не кэшируются.'
+        )
+        settings.DATABASE_REPLICAS = []
+        response = client.get(url)
+        assert 'ETag' in response, (
+            'Проверьте, что ответы из основной базы получают ETag.'
+        )
+        assert cache.get(CARD_KEY.format(titles[0]['id'])) is not None, (
+            'Проверьте, что карточки из основной базы кэшируются.'
+        )
@@ -0,0 +1,166 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20BackgroundDelete:
+
+    @pytest.fixture(autouse=True)
+    def small_batches(self, settings):
+        settings.PURGE_THRESHOLD = 1
+        settings.PURGE_BATCH_SIZE = 1
+        settings.PURGE_PAUSE = 0
+
+    def test_01_heavy_title_is_hidden_and_purged(self, admin_client, admin,
+                                                 user, user_client, settings):
+        from reviews.models import Comment, PurgeJob, Review, Title
+        from reviews.purge import purger
+
+        # Фоновый поток запускается после проверок: тестовая база в памяти
+        # не ждёт блокировку параллельной записи.
+        settings.PURGE_IN_BACKGROUND = False
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        response = admin_client.delete(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            'Проверьте, что удаление произведения с большим числом отзывов '
+            'возвращает статус 202.'
+        )
+        job = response.json()
+        assert job['total'] == 6
+        response = admin_client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что произведение скрывается сразу после запроса на '
+            'удаление.'
+        )
+        response = admin_client.get(f'/api/v1/titles/{title_id}/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        settings.PURGE_IN_BACKGROUND = True
+        purger.resume()
+        purger.flush()
+        response = admin_client.get(f'/api/v1/purges/{job["id"]}/')
+        assert response.status_code == HTTPStatus.OK
+        assert (response.json()['status'], response.json()['deleted']) == (
+            PurgeJob.DONE, 6
+        ), (
+            'Проверьте, что ожидающие задачи продолжаются при старте сервера '
+            'и сообщают о прогрессе.'
+        )
+        assert not Title.objects.filter(pk=title_id).exists()
+        assert not Review.objects.exists()
+        assert not Comment.objects.exists()
+
+    def test_02_light_title_is_deleted_inline(self, admin_client, settings):
+        from tests.utils import create_titles
+
+        settings.PURGE_THRESHOLD = 1000
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_03_heavy_user_purged_by_command(self, admin_client, admin,
+                                             user, user_client, settings):
+        from reviews.models import Comment, PurgeJob, Review, Title
+        from users.models import User
+
+        settings.PURGE_IN_BACKGROUND = False
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.ACCEPTED
+        response = admin_client.get(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что скрытый пользователь теряет доступ сразу.'
+        )
+
+        call_command('purge_deleted')
+        assert PurgeJob.objects.get().status == PurgeJob.DONE
+        assert not User.objects.filter(pk=user.pk).exists()
+        assert Review.objects.filter(author=admin).count() == 1
+        assert not Comment.objects.filter(author=user).exists()
+        assert Title.objects.get(pk=titles[0]['id']).rating == 5, (
+            'Проверьте, что рейтинг пересчитывается при фоновом удалении '
+            'отзывов пользователя.'
+        )
+
+    def test_04_purges_admin_only(self, user_client):
+        response = user_client.get('/api/v1/purges/')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_05_failed_job_is_retried(self, admin_client, admin, user,
+                                      user_client, settings, monkeypatch):
+        from reviews import purge
+        from reviews.models import PurgeJob, Review, Title
+
+        settings.PURGE_IN_BACKGROUND = False
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.ACCEPTED
+        delete_batch = purge.delete_batch
+
+        def fail_after_first_batch(job, queryset):
+            if job.deleted:
+                raise RuntimeError('database is locked')
+            return delete_batch(job, queryset)
+
+        monkeypatch.setattr(purge, 'delete_batch', fail_after_first_batch)
+        call_command('purge_deleted')
+        job = PurgeJob.objects.get()
+        assert (job.status, job.deleted) == (PurgeJob.FAILED, 1)
+        monkeypatch.setattr(purge, 'delete_batch', delete_batch)
+        call_command('purge_deleted', resume=True)
+        assert PurgeJob.objects.get().status == PurgeJob.FAILED, (
+            'Проверьте, что задачи с ошибкой повторяются только с флагом '
+            '--retry-failed.'
+        )
+        call_command('purge_deleted', retry_failed=True)
+        job = PurgeJob.objects.get()
+        assert (job.status, job.last_error) == (PurgeJob.DONE, ''), (
+            'Проверьте, что задачу с ошибкой можно повторить.'
+        )
+        assert not Title.objects.filter(pk=titles[0]['id']).exists()
+        assert not Review.objects.exists()
+
+    def test_06_purge_touches_versions_once(self, admin_client, admin, user,
+                                            user_client, settings):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        settings.PURGE_IN_BACKGROUND = False
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.ACCEPTED
+        etag = admin_client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            call_command('purge_deleted')
+        review_lookups = [
+            query for query in context.captured_queries
+            if query['sql'].startswith(
+                'SELECT "reviews_review"."title_id" FROM "reviews_review" '
+                'WHERE "reviews_review"."id" ='
+            )
+        ]
+        assert not review_lookups, (
+            'Проверьте, что фоновое удаление не ищет произведение для '
+            'каждого удаляемого комментария.'
+        )
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что по завершении удаления версии затронутых '
+            'произведений сдвигаются.'
+        )
@@ -0,0 +1,59 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21TitleCards:
+
+    def test_01_cards_match_serializer(self, admin_client, client):
+        from api.serializers import TitleListRetrieveSerializer
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        expected = TitleListRetrieveSerializer(
+            Title.objects.order_by('name'), many=True
+        ).data
+        assert response.json()['results'] == expected, (
+            'Проверьте, что карточки произведений совпадают с ответом '
+            'сериализатора.'
+        )
+        assert response.json()['count'] == 2
+
+    def test_02_hot_path_skips_serializer(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        first = client.get('/api/v1/titles/').json()
+        with mock.patch(
+            'api.cards.TitleListRetrieveSerializer',
+            side_effect=AssertionError('serializer on hot path'),
+        ):
+            response = client.get('/api/v1/titles/?ordering=name')
+            detail = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что список произведений собирается из готовых '
+            'карточек без сериализатора.'
+        )
+        assert response.json()['results'] == first['results']
+        assert detail.status_code == HTTPStatus.OK
+
+    def test_03_card_follows_rating_and_genres(self, admin_client,
+                                               user_client):
+        titles, _, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert admin_client.get(url).json()['rating'] is None
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        assert admin_client.get(url).json()['rating'] == 7, (
+            'Проверьте, что карточка пересобирается при изменении рейтинга.'
+        )
+        response = admin_client.patch(url, data={'genre': [genres[2]['slug']]})
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            genre['slug'] for genre in admin_client.get(url).json()['genre']
+        ] == [genres[2]['slug']], (
+            'Проверьте, что карточка пересобирается при изменении жанров.'
+        )
@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22SparseFields:
+
+    def test_01_titles_fields(self, admin_client, client):
+        create_comments(admin_client, {})
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert results and all(
+            set(title) == {'id', 'name', 'rating'} for title in results
+        ), 'Проверьте, что параметр `fields` ограничивает поля ответа.'
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert '"description"' not in sql, (
+            'Проверьте, что неиспользуемые столбцы не загружаются из БД.'
+        )
+        assert 'reviews_genre' not in sql, (
+            'Проверьте, что жанры не подгружаются, если поле `genre` не '
+            'запрошено.'
+        )
+
+    def test_02_title_detail_with_genre(self, admin_client, client):
+        _, _, titles = create_comments(admin_client, {})
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/?fields=name,genre,category'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.json()) == {'name', 'genre', 'category'}
+        assert len(response.json()['genre']) == 2
+
+    def test_03_reviews_and_comments_fields(self, admin_client, admin,
+                                            user, user_client, client):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(f'{url}?fields=score')
+        assert [set(review) for review in response.json()['results']] == [
+            {'score'}, {'score'}
+        ]
+        response = client.get(f'{url}?fields=author&pagination=cursor')
+        assert response.status_code == HTTPStatus.OK
+        assert {
+            review['author'] for review in response.json()['results']
+        } == {admin.username, user.username}
+        response = client.get(
+            f'{url}{reviews[0]["id"]}/comments/?fields=id,text'
+        )
+        assert all(
+            set(comment) == {'id', 'text'}
+            for comment in response.json()['results']
+        )
+
+    def test_04_unknown_field(self, client):
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное поле в `fields` возвращает 400.'
+        )
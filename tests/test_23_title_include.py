@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TitleInclude:
+
+    def test_01_include_reviews_and_comments(self, admin_client, admin,
+                                             user, user_client, moderator,
+                                             moderator_client, client,
+                                             settings):
+        settings.INCLUDE_COMMENTS_LIMIT = 2
+        _, reviews, titles = create_comments(admin_client, {
+            admin: admin_client, user: user_client,
+            moderator: moderator_client,
+        })
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}?include=reviews,reviews.comments')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['name'] == titles[0]['name']
+        assert data['reviews']['count'] == 3
+        assert [review['id'] for review in data['reviews']['results']] == [
+            review['id'] for review in reviews
+        ], 'Проверьте, что `include=reviews` встраивает страницу отзывов.'
+        assert [
+            len(review['comments']) for review in data['reviews']['results']
+        ] == [2, 0, 0], (
+            'Проверьте, что к каждому отзыву встраивается не больше '
+            '`INCLUDE_COMMENTS_LIMIT` комментариев.'
+        )
+        queries = len(context.captured_queries)
+
+        for idx in range(3):
+            create_single_comment(
+                user_client, titles[0]['id'], reviews[1]['id'], f'К {idx}'
+            )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}?include=reviews.comments')
+        assert len(response.json()['reviews']['results'][1]['comments']) == 2
+        assert len(context.captured_queries) == queries, (
+            'Проверьте, что число запросов не зависит от числа комментариев.'
+        )
+
+    def test_02_include_reviews_only(self, admin_client, admin, client):
+        _, _, titles = create_comments(admin_client, {admin: admin_client})
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/?include=reviews'
+        )
+        review = response.json()['reviews']['results'][0]
+        assert 'comments' not in review
+
+    def test_03_unknown_include(self, admin_client, client):
+        _, _, titles = create_comments(admin_client, {})
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/?include=authors'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
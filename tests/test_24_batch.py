@@ -0,0 +1,95 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Batch:
+    url = '/api/v1/batch/'
+
+    def test_01_results_in_request_order(self, admin_client, user_client):
+        titles, categories, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        response = user_client.post(self.url, data={'requests': [
+            {'method': 'GET', 'path': f'/api/v1/titles/{title_id}/'},
+            {'method': 'GET', 'path': '/api/v1/categories/'},
+            {'method': 'GET', 'path': '/api/v1/users/me/'},
+            {'method': 'POST', 'path': f'/api/v1/titles/{title_id}/reviews/',
+             'body': {'text': 'Отзыв из пакета', 'score': 7}},
+            {'method': 'GET', 'path': f'/api/v1/titles/{title_id}/'},
+        ]}, format='json')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [
+            HTTPStatus.OK, HTTPStatus.OK, HTTPStatus.OK, HTTPStatus.CREATED,
+            HTTPStatus.OK,
+        ], 'Проверьте, что ответы возвращаются в порядке подзапросов.'
+        assert results[0]['body']['id'] == title_id
+        assert results[1]['body']['count'] == len(categories)
+        assert results[2]['body']['username'] == 'TestUser', (
+            'Проверьте, что подзапросы выполняются от имени автора пакета.'
+        )
+        assert results[3]['body']['author'] == 'TestUser'
+        assert results[4]['body']['rating'] == 7, (
+            'Проверьте, что запрос после записи видит её результат.'
+        )
+        assert 'ETag' in results[0]['headers']
+
+    def test_02_errors_are_per_item(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = APIClient().post(self.url, data={'requests': [
+            {'method': 'get', 'path': '/api/v1/titles/0/'},
+            {'method': 'GET', 'path': '/api/v1/nowhere/'},
+            {'method': 'DELETE', 'path': f'/api/v1/titles/{titles[0]["id"]}/'},
+        ]}, format='json')
+        assert response.status_code == HTTPStatus.OK
+        statuses = [result['status'] for result in response.json()['results']]
+        assert statuses == [
+            HTTPStatus.NOT_FOUND, HTTPStatus.NOT_FOUND,
+            HTTPStatus.UNAUTHORIZED,
+        ], 'Проверьте, что ошибка подзапроса не прерывает весь пакет.'
+
+    def test_03_invalid_batches(self, settings):
+        settings.BATCH_MAX_REQUESTS = 2
+        item = {'method': 'GET', 'path': '/api/v1/titles/'}
+        for data in (
+            {'requests': []},
+            {'requests': [item] * 3},
+            {'requests': [{'method': 'GET', 'path': '/api/v1/batch/'}]},
+            {'requests': [{'method': 'HEAD', 'path': '/api/v1/titles/'}]},
+            {'requests': [{'method': 'GET', 'path': '/admin/'}]},
+        ):
+            response = APIClient().post(self.url, data=data, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что пакет {data} отклоняется со статусом 400.'
+            )
+
+    def test_04_oversized_batch_is_rejected_before_resolving(self, settings):
+        settings.BATCH_MAX_REQUESTS = 2
+        item = {'method': 'GET', 'path': '/api/v1/titles/'}
+        with mock.patch('api.serializers.resolve') as resolve:
+            response = APIClient().post(
+                self.url, data={'requests': [item] * 3}, format='json'
+            )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not resolve.called, (
+            'Проверьте, что размер пакета проверяется до разбора '
+            'подзапросов.'
+        )
+
+    def test_05_streaming_sub_request(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.post(self.url, data={'requests': [
+            {'method': 'GET', 'path': '/api/v1/export/titles/'},
+            {'method': 'GET', 'path': '/api/v1/titles/'},
+        ]}, format='json')
+        assert response.status_code == HTTPStatus.OK
+        statuses = [result['status'] for result in response.json()['results']]
+        assert statuses == [HTTPStatus.BAD_REQUEST, HTTPStatus.OK], (
+            'Проверьте, что потоковый ответ подзапроса заменяется ошибкой, '
+            'а не прерывает пакет.'
+        )
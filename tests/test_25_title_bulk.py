@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TitleBulk:
+    url = '/api/v1/titles/bulk/'
+
+    def test_01_keeps_order_and_reports_missing(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        ids = [titles[1]['id'], 0, titles[0]['id'], titles[1]['id']]
+        response = client.get(self.url, {'ids': ','.join(map(str, ids))})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id'], titles[0]['id']
+        ], 'Проверьте, что произведения возвращаются в порядке `ids`.'
+        assert data['missing'] == [0], (
+            'Проверьте, что ненайденные id перечисляются в `missing`.'
+        )
+        assert data['results'][1] == client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/'
+        ).json(), 'Проверьте, что карточки совпадают с `/titles/{id}/`.'
+
+    def test_02_single_query_batch(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        ids = ','.join(str(title['id']) for title in titles)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.url, {'ids': ids})
+        assert response.status_code == HTTPStatus.OK
+        assert len(context.captured_queries) <= 2, (
+            'Проверьте, что произведения и их жанры загружаются не более '
+            'чем двумя запросами.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            client.get(self.url, {'ids': ids})
+        assert len(context.captured_queries) <= 1
+
+    def test_03_reflects_changes(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        client.get(self.url, {'ids': title_id})
+        admin_client.patch(f'/api/v1/titles/{title_id}/', data={
+            'name': 'Новое название'
+        })
+        response = client.get(self.url, {'ids': title_id})
+        assert response.json()['results'][0]['name'] == 'Новое название'
+
+    def test_04_invalid_ids(self, client, settings):
+        settings.TITLE_BULK_MAX_IDS = 2
+        for params in ({}, {'ids': 'a,b'}, {'ids': ','}, {'ids': '1,2,3'}):
+            response = client.get(self.url, params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что запрос с параметрами {params} отклоняется '
+                'со статусом 400.'
+            )
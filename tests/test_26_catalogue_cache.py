@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+CATALOGUE_TABLES = ('"reviews_category"', '"reviews_genre"')
+SLUG_LOOKUPS = ('"reviews_category"."slug" =', '"reviews_genre"."slug" =')
+
+
+def catalogue_queries(context, patterns=CATALOGUE_TABLES):
+    return [
+        query['sql'] for query in context.captured_queries
+        if any(pattern in query['sql'] for pattern in patterns)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26CatalogueCache:
+
+    def test_01_titles_without_catalogue_queries(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': 'Чужие', 'year': 1986,
+                'genre': [genres[0]['slug'], genres[2]['slug']],
+                'category': categories[0]['slug'],
+            })
+            assert response.status_code == HTTPStatus.CREATED
+        assert not catalogue_queries(context, SLUG_LOOKUPS), (
+            'Проверьте, что слаги категории и жанров ищутся в каталоге в '
+            'памяти, а не в базе.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?format=api')
+            assert response.status_code == HTTPStatus.OK
+            response = client.get(
+                f'/api/v1/titles/{titles[0]["id"]}/?fields=category,genre'
+            )
+            assert response.status_code == HTTPStatus.OK
+        assert not catalogue_queries(context), (
+            'Проверьте, что категории и жанры произведений берутся из '
+            'каталога в памяти, а не из базы.'
+        )
+        assert response.json() == {
+            'category': {
+                'name': categories[0]['name'], 'slug': categories[0]['slug']
+            },
+            'genre': sorted(
+                [genres[0], genres[1]], key=lambda genre: genre['name']
+            ),
+        }
+
+    def test_02_catalogue_changes_are_picked_up(self, admin_client):
+        from reviews.models import Category
+
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.post('/api/v1/categories/', data={
+            'name': 'Сериал', 'slug': 'series'
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'category': 'series'}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новая категория доступна сразу после создания.'
+        )
+        Category.objects.filter(slug='series').get().delete()
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['category'] is None
+
+        category = Category.objects.create(name='Старое', slug='renamed')
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'category': 'renamed'}
+        )
+        category.name = 'Новое'
+        category.save()
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['category']['name'] == 'Новое', (
+            'Проверьте, что изменение категории сбрасывает каталог в памяти.'
+        )
+
+    def test_03_unknown_slug(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'category': 'missing', 'genre': ['missing']},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'category', 'genre'}
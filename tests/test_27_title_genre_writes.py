@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre, create_titles
+
+
+def genre_title_queries(context, statement):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith(statement)
+        and '"reviews_genretitle"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleGenreWrites:
+
+    def test_01_create_inserts_links_at_once(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': 'Чужие', 'year': 1986,
+                'genre': [genre['slug'] for genre in genres],
+                'category': categories[0]['slug'],
+            })
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(response.json()['genre']) == len(genres)
+        assert len(genre_title_queries(context, 'INSERT')) == 1, (
+            'Проверьте, что связи произведения с жанрами создаются одним '
+            'запросом.'
+        )
+
+    def test_02_update_applies_diff(self, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(url, data={
+                'genre': [genres[2]['slug'], genres[1]['slug']]
+            })
+        assert response.status_code == HTTPStatus.OK
+        assert len(genre_title_queries(context, 'INSERT')) == 1
+        assert len(genre_title_queries(context, 'DELETE')) == 1, (
+            'Проверьте, что лишние связи с жанрами удаляются одним запросом.'
+        )
+        expected = sorted(
+            [genres[1], genres[2]], key=lambda genre: genre['name']
+        )
+        assert response.json()['genre'] == expected
+        assert admin_client.get(url).json()['genre'] == expected, (
+            'Проверьте, что карточка произведения обновляется после смены '
+            'жанров.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            admin_client.patch(url, data={'name': 'Терминатор 2'})
+        assert not genre_title_queries(context, 'DELETE'), (
+            'Проверьте, что жанры не перезаписываются, если их не меняли.'
+        )
+
+    def test_03_unknown_slugs_in_one_error(self, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'genre': ['first-missing', genres[0]['slug'],
+                            'second-missing']},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = ' '.join(response.json()['genre'])
+        assert 'first-missing' in errors and 'second-missing' in errors, (
+            'Проверьте, что все неизвестные слаги жанров перечислены в '
+            'одной ошибке.'
+        )
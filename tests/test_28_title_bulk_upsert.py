@@ -0,0 +1,90 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TitleBulkUpsert:
+    url = '/api/v1/titles/bulk/'
+
+    def test_01_json_array_with_per_item_results(self, admin_client,
+                                                 settings):
+        from reviews.models import Title
+
+        settings.TITLE_BULK_CHUNK_SIZE = 2
+        titles, categories, genres = create_titles(admin_client)
+        items = [
+            {'name': 'Чужие', 'year': 1986, 'category': categories[0]['slug'],
+             'genre': [genres[0]['slug'], genres[1]['slug']]},
+            {'id': titles[0]['id'], 'name': 'Терминатор 2',
+             'genre': [genres[2]['slug']]},
+            {'name': 'Без жанров', 'year': 3000,
+             'category': categories[0]['slug'], 'genre': ['unknown']},
+            {'id': 0, 'name': 'Нет такого'},
+            'не объект',
+        ]
+        response = admin_client.post(self.url, data=items, format='json')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [result['status'] for result in data['results']] == [
+            HTTPStatus.CREATED, HTTPStatus.OK, HTTPStatus.BAD_REQUEST,
+            HTTPStatus.NOT_FOUND, HTTPStatus.BAD_REQUEST,
+        ], 'Проверьте, что для каждого элемента возвращается свой статус.'
+        assert [result['index'] for result in data['results']] == list(
+            range(len(items))
+        )
+        assert (data['created'], data['updated'], data['failed']) == (1, 1, 3)
+        assert set(data['results'][2]['errors']) == {'year', 'genre'}
+
+        created = admin_client.get(
+            f'/api/v1/titles/{data["results"][0]["id"]}/'
+        ).json()
+        assert created['name'] == 'Чужие'
+        assert len(created['genre']) == 2
+        updated = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert updated.json()['name'] == 'Терминатор 2', (
+            'Проверьте, что элемент с `id` обновляет произведение.'
+        )
+        assert updated.json()['genre'] == [genres[2]]
+        assert Title.objects.count() == 3
+
+    def test_02_ndjson_stream(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        lines = [
+            json.dumps({
+                'name': f'Произведение {number}', 'year': 2000,
+                'category': categories[1]['slug'],
+                'genre': [genres[number % 3]['slug']],
+            }, ensure_ascii=False)
+            for number in range(5)
+        ]
+        response = admin_client.generic(
+            'POST', self.url, '\n'.join(lines) + '\n',
+            content_type='application/x-ndjson',
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['created'] == 5, (
+            'Проверьте, что эндпоинт принимает NDJSON.'
+        )
+        response = admin_client.get('/api/v1/titles/', {
+            'category': categories[1]['slug']
+        })
+        assert response.json()['count'] == 6
+
+    def test_03_admin_only_and_limits(self, admin_client, user_client,
+                                      settings):
+        item = {'name': 'Чужие', 'year': 1986}
+        response = user_client.post(self.url, data=[item], format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        settings.TITLE_BULK_MAX_ITEMS = 1
+        for data in ([], [item, item], {'items': [item]}):
+            response = admin_client.post(self.url, data=data, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.generic(
+            'POST', self.url, '{"name": \n',
+            content_type='application/x-ndjson',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,84 @@
+import csv
+import gzip
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+def read(response):
+    body = b''.join(response.streaming_content)
+    if response.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return body.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29Export:
+
+    def test_01_titles_ndjson_with_filter(self, admin_client, settings):
+        settings.EXPORT_CHUNK_SIZE = 1
+        _, _, titles = create_comments(admin_client, {})
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоком.'
+        )
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        assert [row['id'] for row in rows] == sorted(
+            title['id'] for title in titles
+        ), 'Проверьте, что выгрузка содержит все произведения.'
+        first = next(row for row in rows if row['id'] == titles[0]['id'])
+        assert first['category'] == titles[0]['category']
+        assert first['genre'] == sorted(titles[0]['genre'])
+
+        response = admin_client.get(
+            '/api/v1/export/titles/', {'name': titles[1]['name']}
+        )
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        assert [row['id'] for row in rows] == [titles[1]['id']], (
+            'Проверьте, что выгрузка фильтруется параметрами TitleFilter.'
+        )
+
+    def test_02_reviews_csv_gzip(self, admin_client, admin, user,
+                                 user_client):
+        reviews, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.get(
+            '/api/v1/export/reviews/',
+            {'format': 'csv', 'title': titles[0]['id']},
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что выгрузка сжимается, если клиент принимает gzip.'
+        )
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(read(response))))
+        assert {row['author'] for row in rows} == {
+            admin.username, user.username
+        }
+        assert {int(row['title_id']) for row in rows} == {titles[0]['id']}
+
+    def test_03_comments_and_empty_csv(self, admin_client):
+        response = admin_client.get(
+            '/api/v1/export/comments/', HTTP_ACCEPT='text/csv'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert read(response).splitlines() == [
+            'id,review_id,author,text,pub_date'
+        ]
+
+    def test_04_admin_only(self, user_client, admin_client):
+        response = user_client.get('/api/v1/export/titles/')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get('/api/v1/export/users/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = admin_client.get(
+            '/api/v1/export/reviews/', {'title': 'abc'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,138 @@
+import csv
+import gzip
+
+import pytest
+from django.core.management import call_command
+
+from tests.test_11_load_data import DATASET
+
+
+def read_csv(path):
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        return next(reader), list(reader)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    source = tmp_path / 'source'
+    source.mkdir()
+    for filename, (header, rows) in DATASET.items():
+        with open(source / filename, 'w', encoding='utf-8',
+                  newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header)
+            writer.writerows(rows)
+    return source
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30DumpData:
+
+    def test_01_dump_matches_load_data_format(self, data_dir, tmp_path):
+        call_command('load_data', path=str(data_dir))
+        target = tmp_path / 'dump'
+        call_command('dump_data', path=str(target), chunk_size=2, workers=3)
+        for filename, (header, rows) in DATASET.items():
+            dumped_header, dumped_rows = read_csv(target / filename)
+            assert dumped_header[:len(header)] == list(header), (
+                f'Проверьте, что `dump_data` пишет столбцы {filename} в '
+                'порядке, который ожидает `load_data`.'
+            )
+            assert [row[:len(header)] for row in dumped_rows] == [
+                [str(value) for value in row] for row in rows
+            ], f'Проверьте содержимое {filename} после `dump_data`.'
+
+    def test_02_compressed_dump_loads_back(self, data_dir, tmp_path):
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title)
+        from users.models import User
+
+        call_command('load_data', path=str(data_dir))
+        Title.objects.filter(pk=1).update(description='Описание')
+        target = tmp_path / 'dump'
+        call_command('dump_data', path=str(target), compress=True)
+        assert sorted(path.name for path in target.iterdir()) == sorted(
+            f'{filename}.gz' for filename in DATASET
+        )
+        counts = [
+            model.objects.count()
+            for model in (Title, GenreTitle, Review, Comment)
+        ]
+        for model in (Comment, Review, GenreTitle, Title, Genre, Category,
+                      User):
+            model.objects.all().delete()
+        call_command('load_data', path=str(target))
+        assert [
+            model.objects.count()
+            for model in (Title, GenreTitle, Review, Comment)
+        ] == counts, 'Проверьте, что сжатая выгрузка загружается обратно.'
+        assert Title.objects.get(pk=1).description == 'Описание'
+
+    def test_03_skips_hidden_and_unknown_tables(self, data_dir, tmp_path):
+        from django.core.management.base import CommandError
+        from reviews.models import Title
+
+        call_command('load_data', path=str(data_dir))
+        Title.objects.filter(pk=1).update(is_hidden=True)
+        target = tmp_path / 'dump'
+        call_command('dump_data', 'titles', 'review', path=str(target))
+        assert sorted(path.name for path in target.iterdir()) == [
+            'review.csv', 'titles.csv'
+        ]
+        _, titles = read_csv(target / 'titles.csv')
+        _, reviews = read_csv(target / 'review.csv')
+        assert '1' not in {row[0] for row in titles}, (
+            'Проверьте, что скрытые до удаления произведения не выгружаются.'
+        )
+        assert '1' not in {row[1] for row in reviews}
+        with pytest.raises(CommandError):
+            call_command('dump_data', 'nothing', path=str(target))
+
+    def test_04_reads_tables_in_one_transaction(self, data_dir, tmp_path):
+        import threading
+        from unittest import mock
+
+        from django.db.backends.utils import CursorWrapper
+
+        call_command('load_data', path=str(data_dir))
+        reads = []
+        execute = CursorWrapper._execute_with_wrappers
+
+        def record(cursor, sql, *args, **kwargs):
+            if sql.lstrip().upper().startswith('SELECT'):
+                reads.append(
+                    (threading.get_ident(), cursor.db.in_atomic_block)
+                )
+            return execute(cursor, sql, *args, **kwargs)
+
+        with mock.patch.object(
+            CursorWrapper, '_execute_with_wrappers', record
+        ):
+            call_command(
+                'dump_data', path=str(tmp_path / 'dump'), chunk_size=2,
+                workers=3,
+            )
+        assert len(reads) >= len(DATASET)
+        assert set(reads) == {(threading.get_ident(), True)}, (
+            'Проверьте, что `dump_data` читает все таблицы одним '
+            'соединением в одной транзакции, а потоки только пишут файлы.'
+        )
+
+    def test_05_write_failure_is_reported(self, data_dir, tmp_path):
+        from unittest import mock
+
+        from django.core.management.base import CommandError
+
+        call_command('load_data', path=str(data_dir))
+        target = tmp_path / 'dump'
+        with mock.patch(
+            'reviews.management.commands.dump_data.to_csv_value',
+            side_effect=OSError('disk full'),
+        ), pytest.raises(CommandError, match='disk full'):
+            call_command('dump_data', path=str(target), chunk_size=1,
+                         workers=2)
+        assert not list(target.glob('*.tmp')), (
+            'Проверьте, что `dump_data` удаляет временные файлы при сбое.'
+        )